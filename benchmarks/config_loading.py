@@ -0,0 +1,99 @@
+"""
+Benchmark loading a large, synthetic showyourwork configuration file.
+
+The config lists ``--entries`` static files and the same number of dynamic
+scripts. The time spent parsing the YAML, normalizing the keys, and validating
+the full config (without the config cache) are reported separately. If
+``--max-ms`` is provided, the script exits with a non-zero status when the
+median time for loading and normalizing the config exceeds that threshold.
+
+Usage::
+
+    python benchmarks/config_loading.py [--entries 10000] [--repeat 5] [--max-ms 500]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any, Callable, List
+
+import yaml
+
+from showyourwork2.config.config import SafeLoader, normalize_keys, parse_config
+
+
+def generate_config(entries: int) -> str:
+    lines = ["config-version: 2", "documents:", "  - ms.tex", "static:"]
+    lines += [f"  - static/file-{n}.dat" for n in range(entries)]
+    lines.append("dynamic:")
+    for n in range(entries):
+        lines += [
+            f"  - script: scripts/script-{n}.py",
+            f"    input: [static/file-{n}.dat]",
+            f"    output: figures/figure-{n}.pdf",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def timeit(func: Callable[[], Any], repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def summarize(label: str, timings: List[float]) -> None:
+    print(
+        f"{label:>16}: median {statistics.median(timings):.1f}ms, "
+        f"min {min(timings):.1f}ms ({len(timings)} runs)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entries", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    with TemporaryDirectory() as d:
+        # Make sure that we don't hit the config cache
+        os.environ["SHOWYOURWORK_CACHE_DIR"] = d
+
+        config_file = Path(d) / "showyourwork.yml"
+        config_file.write_text(generate_config(args.entries))
+
+        def load() -> Any:
+            with open(config_file, "r") as f:
+                return yaml.load(f, Loader=SafeLoader)
+
+        def load_pure() -> Any:
+            with open(config_file, "r") as f:
+                return yaml.load(f, Loader=yaml.SafeLoader)
+
+        raw = load()
+        print(f"Using {SafeLoader.__name__} with {args.entries} entries")
+        yaml_timings = timeit(load, args.repeat)
+        summarize("yaml", yaml_timings)
+        if SafeLoader is not yaml.SafeLoader:
+            summarize("yaml (pure)", timeit(load_pure, args.repeat))
+        normalize_timings = timeit(lambda: normalize_keys(raw), args.repeat)
+        summarize("normalize", normalize_timings)
+        summarize("validate", timeit(lambda: parse_config(raw), 1))
+
+    total = statistics.median(yaml_timings) + statistics.median(normalize_timings)
+    if args.max_ms is not None and total > args.max_ms:
+        sys.exit(
+            f"Loading the config took {total:.1f}ms, longer than the allowed "
+            f"{args.max_ms:.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
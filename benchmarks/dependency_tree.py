@@ -0,0 +1,91 @@
+"""
+Benchmark simplifying synthetic dependency trees of increasing size.
+
+Each tree has ``N`` nodes: a third are files in the project, a third are
+intermediate files in the working directory, and the rest are files inside of
+directory outputs in the working directory, which must be resolved using a
+prefix lookup. Project files depend on a few of the ``WINDOW`` nodes that
+precede them, and intermediate files only depend on project files, so that the
+simplified tree stays linear in size like it would for an analysis pipeline. If
+``--max-ms`` is provided, the script exits with a non-zero status when the
+largest tree takes longer than that threshold to simplify.
+
+Usage::
+
+    python benchmarks/dependency_tree.py [--sizes 1000 10000 100000] [--max-ms 5000]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from showyourwork2.dependencies import simplify_dependency_tree
+
+WORK = Path("/work")
+WINDOW = 50
+
+
+def generate_tree(size: int, seed: int = 42) -> Dict[str, List[str]]:
+    rng = random.Random(seed)
+    names: List[str] = []
+    project: List[str] = []
+    tree: Dict[str, List[str]] = {}
+    directories = max(1, size // 100)
+    for n in range(size):
+        kind = n % 3
+        if kind == 0:
+            name = f"figures/figure-{n}.pdf"
+        elif kind == 1:
+            name = str(WORK / "intermediate" / f"file-{n}.dat")
+        else:
+            name = str(WORK / "directories" / f"dir-{n % directories}" / f"{n}.dat")
+        recent = names[-WINDOW:] if kind == 0 else project[-WINDOW:]
+        parents = rng.sample(recent, min(len(recent), 3))
+        if kind == 2:  # noqa: PLR2004
+            # Files in directory outputs are looked up via their parent
+            # directory, so register that directory as a node instead
+            tree[str(Path(name).parent)] = parents
+        else:
+            tree[name] = parents
+        names.append(name)
+        if kind == 0:
+            project.append(name)
+    return tree
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    median = 0.0
+    for size in args.sizes:
+        tree = generate_tree(size)
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            simplify_dependency_tree(tree, WORK)
+            timings.append((time.perf_counter() - start) * 1000)
+        median = statistics.median(timings)
+        print(
+            f"{size:>8} nodes: median {median:.1f}ms, "
+            f"min {min(timings):.1f}ms ({len(timings)} runs)"
+        )
+
+    if args.max_ms is not None and median > args.max_ms:
+        sys.exit(
+            f"Simplifying the dependency tree took {median:.1f}ms, longer than the "
+            f"allowed {args.max_ms:.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
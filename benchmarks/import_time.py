@@ -0,0 +1,72 @@
+"""
+Measure the import time of the ``showyourwork2`` command line interface and
+the wall time of ``showyourwork2 --version``.
+
+The import time is measured using ``python -X importtime`` in a fresh
+interpreter for each run. If ``--max-ms`` is provided, the script exits with a
+non-zero status when the median import time exceeds that threshold, so that it
+can be used to catch regressions.
+
+Usage::
+
+    python benchmarks/import_time.py [--repeat 10] [--max-ms 150]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from typing import List
+
+MODULE = "showyourwork2.cli"
+
+
+def import_time_ms(module: str) -> float:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    for line in result.stderr.splitlines():
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:  # noqa: PLR2004
+            return int(parts[1]) / 1000
+    raise RuntimeError(f"Could not find the import time for {module}")
+
+
+def version_time_ms() -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "showyourwork2", "--version"],
+        check=True,
+        capture_output=True,
+    )
+    return (time.perf_counter() - start) * 1000
+
+
+def summarize(label: str, timings: List[float]) -> None:
+    print(
+        f"{label:>10}: median {statistics.median(timings):.1f}ms, "
+        f"min {min(timings):.1f}ms ({len(timings)} runs)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--max-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    imports = [import_time_ms(MODULE) for _ in range(args.repeat)]
+    versions = [version_time_ms() for _ in range(args.repeat)]
+    summarize("import", imports)
+    summarize("--version", versions)
+
+    if args.max_ms is not None and statistics.median(imports) > args.max_ms:
+        sys.exit(f"Importing {MODULE} took longer than the allowed {args.max_ms:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
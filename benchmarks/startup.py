@@ -0,0 +1,65 @@
+"""
+Compare the cold-start latency of ``showyourwork2 build`` when snakemake is
+executed in a subprocess (the default) and when it is executed in-process.
+
+Each measurement launches a fresh interpreter and performs a dry run of the
+requested project, so the timings include interpreter startup, imports, and
+workflow parsing, but not the execution of any jobs.
+
+Usage::
+
+    python benchmarks/startup.py [--project examples/simple] [--repeat 5] \
+        [snakemake_args ...]
+
+Any extra arguments are passed through to snakemake. For example, targeting
+``syw__save_config`` skips the conda environment checks, which otherwise
+dominate the timings.
+"""
+
+import argparse
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import List
+
+
+def time_build(
+    project: Path, repeat: int, in_process: bool, snakemake_args: List[str]
+) -> List[float]:
+    cmd = [sys.executable, "-m", "showyourwork2", "build"]
+    if in_process:
+        cmd.append("--in-process")
+    cmd += snakemake_args + ["--dry-run", "--quiet"]
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=project, check=True, capture_output=True)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--project", type=Path, default=Path("examples/simple"))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("snakemake_args", nargs="*")
+    args = parser.parse_args()
+
+    with TemporaryDirectory() as d:
+        project = Path(d) / args.project.name
+        shutil.copytree(args.project, project)
+        for in_process in (False, True):
+            timings = time_build(project, args.repeat, in_process, args.snakemake_args)
+            label = "in-process" if in_process else "subprocess"
+            print(
+                f"{label:>10}: median {statistics.median(timings):.3f}s, "
+                f"min {min(timings):.3f}s ({args.repeat} runs)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark parsing the workflow for projects with many TeX documents.
+
+Each synthetic project has ``N`` documents that all use the ``classic`` theme,
+which ships several resource files. For each project size, the workflow is
+parsed (including setting the rule order) by listing its rules with snakemake,
+and the number of rules and the parse time are reported. If ``--max-ms`` is
+provided, the script exits with a non-zero status when the largest project
+takes longer than that threshold to parse.
+
+Usage::
+
+    python benchmarks/workflow_parsing.py [--documents 1 10 50] [--max-ms 20000]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import List, Tuple
+
+from showyourwork2.paths import package_data
+
+
+def generate_project(path: Path, documents: int) -> None:
+    lines = ["config-version: 2", "documents:"]
+    for n in range(documents):
+        (path / f"ms-{n}.tex").write_text(
+            "\\documentclass{article}\n\\usepackage{showyourwork}\n"
+            "\\begin{document}\nDocument\n\\end{document}\n"
+        )
+        lines += [f"  - path: ms-{n}.tex", "    theme: classic"]
+    (path / "showyourwork.yml").write_text("\n".join(lines) + "\n")
+    subprocess.run(["git", "init", "-q"], cwd=path, check=True)
+
+
+def time_parse(path: Path, repeat: int) -> Tuple[int, List[float]]:
+    cmd = [
+        sys.executable,
+        "-m",
+        "snakemake",
+        "--snakefile",
+        str(package_data("showyourwork2", "workflow", "Snakefile")),
+        "--configfile",
+        "showyourwork.yml",
+        "--cores",
+        "1",
+        "--list",
+    ]
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=path, check=True, capture_output=True)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    # The rule list is written to the snakemake log, with indented docstrings
+    log = path / ".showyourwork" / "logs" / "snakemake.log"
+    rules = sum(1 for line in log.read_text().splitlines() if line[:1].strip())
+    return rules, timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--documents", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    median = 0.0
+    with TemporaryDirectory() as d:
+        # Make sure that we don't hit the config cache
+        os.environ["SHOWYOURWORK_CACHE_DIR"] = str(Path(d) / "cache")
+        for documents in args.documents:
+            path = Path(d) / f"project-{documents}"
+            path.mkdir()
+            generate_project(path, documents)
+            rules, timings = time_parse(path, args.repeat)
+            median = statistics.median(timings)
+            print(
+                f"{documents:>6} documents: {rules:>6} rules, "
+                f"median {median:.0f}ms, min {min(timings):.0f}ms "
+                f"({args.repeat} runs)"
+            )
+
+    if args.max_ms is not None and median > args.max_ms:
+        sys.exit(
+            f"Parsing the workflow took {median:.0f}ms, longer than the allowed "
+            f"{args.max_ms:.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
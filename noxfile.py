@@ -53,6 +53,16 @@ def examples(session: nox.Session) -> None:
             session.run("showyourwork2", "build")
 
 
+@snakemake_session
+def benchmark(session: nox.Session) -> None:
+    session.install(".")
+    session.run("python", "benchmarks/import_time.py")
+    session.run("python", "benchmarks/config_loading.py")
+    session.run("python", "benchmarks/dependency_tree.py")
+    session.run("python", "benchmarks/workflow_parsing.py")
+    session.run("python", "benchmarks/startup.py", *session.posargs)
+
+
 @nox.session
 def lint(session: nox.Session) -> None:
     session.install("pre-commit")
@@ -0,0 +1,255 @@
+import hashlib
+import json
+import os
+import shutil
+import sys
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import Any, Dict, Iterable, List, Optional
+
+from showyourwork2.paths import PathLike
+from showyourwork2.utils import copy_file_or_directory
+from showyourwork2.version import __version__
+
+# The maximum number of entries retained in each cache file; older entries are
+# evicted first.
+MAX_ENTRIES = 64
+
+
+def user_cache_dir() -> Path:
+    """The directory used for caching data between showyourwork invocations
+
+    This follows the XDG base directory specification, and can be overridden
+    using the ``SHOWYOURWORK_CACHE_DIR`` environment variable.
+    """
+    if "SHOWYOURWORK_CACHE_DIR" in os.environ:
+        return Path(os.environ["SHOWYOURWORK_CACHE_DIR"])
+    xdg_cache = os.environ.get("XDG_CACHE_HOME")
+    root = Path(xdg_cache) if xdg_cache else Path.home() / ".cache"
+    return root / "showyourwork2"
+
+
+def cache_key(*parts: Any) -> str:
+    """Hash any JSON serializable arguments into a cache key"""
+    data = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def hash_files(files: Iterable[PathLike], *extra: Any) -> str:
+    """Hash the names and contents of a list of files into a cache key
+
+    Directories are hashed recursively, and any extra JSON serializable
+    arguments are included in the key.
+    """
+    hasher = hashlib.sha256(cache_key(*extra).encode())
+    for file in files:
+        path = Path(file)
+        if path.is_dir():
+            members = sorted(p for p in path.rglob("*") if not p.is_dir())
+        else:
+            members = [path]
+        for member in members:
+            hasher.update(f"{member}\0{member.stat().st_size}\0".encode())
+            with open(member, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def _cache_file(name: str) -> Path:
+    return user_cache_dir() / f"{name}.json"
+
+
+def _load_entries(name: str) -> Dict[str, Any]:
+    try:
+        with open(_cache_file(name), "r") as f:
+            entries = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(entries, dict):
+        return {}
+    return entries
+
+
+def load(name: str, key: str) -> Optional[Any]:
+    """Load a cached value, returning ``None`` if the entry doesn't exist
+
+    Any errors reading the cache are treated as a cache miss.
+    """
+    return _load_entries(name).get(key, None)
+
+
+def save(name: str, key: str, value: Any) -> None:
+    """Save a JSON serializable value to the cache
+
+    The cache file is replaced atomically, and failures to write (e.g. because
+    the cache directory is read-only) are silently ignored.
+    """
+    entries = _load_entries(name)
+    entries.pop(key, None)
+    entries[key] = value
+    while len(entries) > MAX_ENTRIES:
+        entries.pop(next(iter(entries)))
+
+    _atomic_write(_cache_file(name), json.dumps(entries))
+
+
+def load_text(name: str, key: str) -> Optional[str]:
+    """Load a large cached value that is stored in its own file"""
+    try:
+        with open(user_cache_dir() / name / key, "r") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def save_text(name: str, key: str, text: str) -> None:
+    """Save a large value to its own file in the cache
+
+    Only the ``MAX_ENTRIES`` most recently written files are retained.
+    """
+    directory = user_cache_dir() / name
+    _atomic_write(directory / key, text)
+    try:
+        files = sorted(directory.iterdir(), key=lambda f: f.stat().st_mtime_ns)
+        for file in files[:-MAX_ENTRIES]:
+            file.unlink()
+    except OSError:
+        pass
+
+
+def restore_output(name: str, output: PathLike, inputs: Iterable[PathLike]) -> bool:
+    """Write the cached contents of an output file given the files it was
+    generated from, returning ``False`` if there is no cached entry
+    """
+    text = load_text(name, hash_files(inputs, __version__))
+    if text is None:
+        return False
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    Path(output).write_text(text)
+    return True
+
+
+def store_output(name: str, output: PathLike, inputs: Iterable[PathLike]) -> None:
+    """Cache the contents of an output file given the files it was generated
+    from
+    """
+    save_text(name, hash_files(inputs, __version__), Path(output).read_text())
+
+
+def restore_outputs(directory: PathLike, key: str, outputs: Iterable[PathLike]) -> bool:
+    """Copy the cached outputs of a rule from a shared cache directory,
+    returning ``False`` if there is no cached entry
+
+    Unlike the other caches, these entries can be large, so they are stored in
+    a separate directory that can be shared between projects.
+    """
+    outputs = list(outputs)
+    entry = Path(directory) / key[:2] / key
+    saved = [entry / str(n) for n in range(len(outputs))]
+    if not entry.is_dir() or not all(path.exists() for path in saved):
+        return False
+    for src, dst in zip(saved, outputs):
+        if Path(dst).is_dir() and not Path(dst).is_symlink():
+            shutil.rmtree(dst)
+        copy_file_or_directory(src, dst, strategy="reflink")
+
+    # Mark the entry as recently used, so that it is evicted last
+    try:
+        os.utime(entry)
+    except OSError:
+        pass
+    return True
+
+
+def store_outputs(
+    directory: PathLike, key: str, outputs: Iterable[PathLike], max_size: int
+) -> None:
+    """Save the outputs of a rule to a shared cache directory
+
+    The least recently used entries are then evicted until the total size of
+    the cache is at most ``max_size`` bytes. Failures to write are ignored.
+    """
+    entry = Path(directory) / key[:2] / key
+    tmp = entry.with_name(f".{entry.name}.{os.getpid()}")
+    try:
+        for n, output in enumerate(outputs):
+            copy_file_or_directory(output, tmp / str(n), strategy="reflink")
+        if entry.exists():
+            shutil.rmtree(entry)
+        os.replace(tmp, entry)
+        _evict_outputs(Path(directory), max_size)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Restore or store outputs from within a workflow rule
+
+    This is used to skip expensive steps (like the TeX dependency pass) when
+    their inputs haven't changed, even when they run in a separate conda
+    environment::
+
+        python -m showyourwork2.cache restore NAME OUTPUT INPUT...
+        python -m showyourwork2.cache store NAME OUTPUT INPUT...
+
+    The outputs of scripts are stored in a shared directory instead, keyed by
+    the contents of the input files and an extra ``KEY``::
+
+        python -m showyourwork2.cache restore-outputs DIR SIZE KEY OUTPUT... -- INPUT...
+        python -m showyourwork2.cache store-outputs DIR SIZE KEY OUTPUT... -- INPUT...
+
+    The exit status of ``restore`` and ``restore-outputs`` is non-zero on a
+    cache miss.
+    """
+    command, *args = sys.argv[1:] if argv is None else argv
+    if command in ("restore-outputs", "store-outputs"):
+        directory, max_size, extra, *paths = args
+        outputs = paths[: paths.index("--")]
+        key = hash_files(paths[len(outputs) + 1 :], extra)
+        if command == "restore-outputs":
+            return 0 if restore_outputs(directory, key, outputs) else 1
+        store_outputs(directory, key, outputs, int(max_size))
+        return 0
+
+    name, output, *inputs = args
+    if command == "restore":
+        return 0 if restore_output(name, output, inputs) else 1
+    if command == "store":
+        store_output(name, output, inputs)
+        return 0
+    raise ValueError(f"Unknown command: '{command}'")
+
+
+def _evict_outputs(directory: Path, max_size: int) -> None:
+    entries = []
+    for entry in directory.glob("*/*"):
+        if entry.name.startswith("."):
+            continue
+        files = [entry] if entry.is_file() else entry.rglob("*")
+        size = sum(f.stat().st_size for f in files if f.is_file())
+        entries.append((entry.stat().st_mtime_ns, size, entry))
+    total = sum(size for _, size, _ in entries)
+    for _, size, entry in sorted(entries):
+        if total <= max_size:
+            break
+        shutil.rmtree(entry, ignore_errors=True)
+        total -= size
+
+
+def _atomic_write(path: Path, text: str) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with NamedTemporaryFile("w", dir=path.parent, delete=False) as f:
+            try:
+                f.write(text)
+            except BaseException:
+                os.unlink(f.name)
+                raise
+        os.replace(f.name, path)
+    except OSError:
+        pass
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,15 +3,17 @@ import subprocess
 import sys
 from pathlib import Path
 from shutil import rmtree
-from typing import Any, Callable, Iterable, Optional, Tuple
+from typing import Any, Callable, Iterable, List, Optional, Tuple
 
 import click
-import snakemake
 
-from showyourwork2 import logging, paths
-from showyourwork2.config import load_config
+from showyourwork2 import cache, paths
 from showyourwork2.version import __version__
 
+# NOTE: Heavy dependencies like snakemake, pydantic, and our config and logging
+# modules are imported within the commands that need them so that the CLI
+# starts up quickly for things like '--help' and '--version'.
+
 
 @click.group()
 @click.version_option(
@@ -46,6 +48,11 @@ def build_arguments(func: Callable[..., Any]) -> Callable[..., Any]:
         type=click.Path(exists=True),
         help="A showyourwork configuration file",
     )(func)
+    func = click.option(
+        "--in-process",
+        is_flag=True,
+        help="Run snakemake in the current Python process instead of a subprocess",
+    )(func)
     func = click.option(
         "-v", "--verbose", is_flag=True, help="Print verbose output to the console"
     )(func)
@@ -60,6 +67,7 @@ def build_arguments(func: Callable[..., Any]) -> Callable[..., Any]:
 @build_arguments
 def build(
     verbose: bool,
+    in_process: bool,
     configfile: Optional[paths.PathLike],
     cores: str,
     conda_frontend: Optional[str],
@@ -72,6 +80,7 @@ def build(
         cores=cores,
         conda_frontend=conda_frontend,
         snakemake_args=snakemake_args,
+        in_process=in_process,
     )
 
 
@@ -88,6 +97,7 @@ def build(
 )
 def clean(
     verbose: bool,
+    in_process: bool,
     configfile: Optional[paths.PathLike],
     cores: str,
     conda_frontend: Optional[str],
@@ -95,31 +105,43 @@ def clean(
     deep: bool,
 ) -> None:
     """Delete all the outputs associated with a previous build."""
-    snakemake_args = list(snakemake_args) + ["--delete-all-output"]
-    _build(
-        verbose=verbose,
-        configfile=configfile,
-        cores=cores,
-        conda_frontend=conda_frontend,
-        snakemake_args=snakemake_args,
-    )
+    from showyourwork2 import logging
+    from showyourwork2.config import load_config
 
-    # We run the clean a second time to handle the fact that the first pass
-    # won't delete outputs that occur before the checkpoint.
-    _build(
-        verbose=verbose,
-        configfile=configfile,
-        cores=cores,
-        conda_frontend=conda_frontend,
-        snakemake_args=snakemake_args,
+    snakemake_args = list(snakemake_args)
+    config_file, cwd, _ = get_config_file_and_project_root(
+        snakemake_args=snakemake_args, config_file=configfile
     )
+    config = load_config(config_file)
+    logger = logging.get_logger(config)
 
-    if deep:
-        config_file, cwd, _ = get_config_file_and_project_root(
-            snakemake_args=snakemake_args, config_file=configfile
+    # Previous builds record all of their outputs in a manifest, including the
+    # ones that are only known after the dependency checkpoint, so we can just
+    # delete those directly. If specific targets were requested or there is no
+    # manifest, we fall back to letting snakemake work out what to delete.
+    manifest_file = cwd / paths.work(config.working_directory).manifest
+    if not snakemake_args and manifest_file.is_file():
+        from showyourwork2.manifest import delete_outputs
+
+        delete_outputs(manifest_file, cwd)
+    else:
+        _build(
+            verbose=verbose,
+            configfile=configfile,
+            cores=cores,
+            conda_frontend=conda_frontend,
+            snakemake_args=snakemake_args + ["--delete-all-output"],
+            in_process=in_process,
         )
-        config = load_config(config_file)
-        logger = logging.get_logger(config)
+
+    # The shared objects and the fingerprints are only used for the build
+    # outputs, so they can be removed once all of those have been deleted
+    work_paths = paths.work(config.working_directory)
+    for directory in [work_paths.objects, work_paths.fingerprints]:
+        if not snakemake_args and (cwd / directory).is_dir():
+            rmtree(cwd / directory)
+
+    if deep:
         syw_dir = cwd / paths.work(config.working_directory).root
         if syw_dir.is_dir():
             logger.info(f"Deleting directory {syw_dir}")
@@ -130,24 +152,142 @@ def clean(
             rmtree(snakemake_dir)
 
 
-def _build(
+@main.command(  # type: ignore[attr-defined]
+    context_settings=dict(
+        ignore_unknown_options=True,
+    )
+)
+@build_arguments
+@click.option(
+    "--interval",
+    default=0.5,
+    type=float,
+    help="How often to check for changes, in seconds",
+)
+@click.option(
+    "--debounce",
+    default=0.5,
+    type=float,
+    help="How long to wait for changes to settle before rebuilding, in seconds",
+)
+def watch(
     verbose: bool,
+    in_process: bool,
     configfile: Optional[paths.PathLike],
     cores: str,
     conda_frontend: Optional[str],
     snakemake_args: Iterable[str],
+    interval: float,
+    debounce: float,
 ) -> None:
+    """Rebuild an article whenever its inputs change.
+
+    Only the artifacts that depend on the changed files are rebuilt. Use
+    '--in-process' to avoid starting a new snakemake process for each rebuild.
+    """
+    from showyourwork2.watch import Watcher
+
+    extra_args = list(snakemake_args)
+    config_file, cwd, _ = get_config_file_and_project_root(
+        snakemake_args=extra_args, config_file=configfile
+    )
+
+    def build(targets: List[str]) -> int:
+        # The targets are relative to the project root, and they must come
+        # before any other arguments since some snakemake options (like
+        # '--config') consume all the arguments that follow them.
+        return _build(
+            verbose=verbose,
+            configfile=config_file,
+            cores=cores,
+            conda_frontend=conda_frontend,
+            snakemake_args=targets + extra_args,
+            in_process=in_process,
+            check=False,
+        )
+
+    Watcher(config_file, cwd, build, interval=interval, debounce=debounce).run()
+
+
+@main.command(  # type: ignore[attr-defined]
+    context_settings=dict(
+        ignore_unknown_options=True,
+    )
+)
+@build_arguments
+def profile(
+    verbose: bool,
+    in_process: bool,
+    configfile: Optional[paths.PathLike],
+    cores: str,
+    conda_frontend: Optional[str],
+    snakemake_args: Iterable[str],
+) -> None:
+    """Build an article and report the run time of each job.
+
+    The start and end times, exit status, and peak memory usage of every job
+    are saved to 'profile.json' in the logs directory, and a summary of the
+    slowest rules and the critical path to each artifact is printed.
+    """
+    from showyourwork2.config import load_config
+    from showyourwork2.profiling import load_profile, profile_file, summarize
+
+    config_file, cwd, _ = get_config_file_and_project_root(
+        snakemake_args=snakemake_args, config_file=configfile
+    )
+    config = load_config(config_file)
+    filename = cwd / profile_file(config)
+    if filename.is_file():
+        filename.unlink()
+
+    returncode = _build(
+        verbose=verbose,
+        configfile=configfile,
+        cores=cores,
+        conda_frontend=conda_frontend,
+        snakemake_args=snakemake_args,
+        in_process=in_process,
+        check=False,
+        config_overrides=["profile=True"],
+    )
+
+    if filename.is_file():
+        targets = [a for doc in config.documents for a in doc.artifacts]
+        summary = summarize(load_profile(filename), targets)
+        with open(filename.with_suffix(".txt"), "w") as f:
+            f.write(summary + "\n")
+        click.echo(summary)
+    if returncode:
+        sys.exit(returncode)
+
+
+def _build(
+    verbose: bool,
+    configfile: Optional[paths.PathLike],
+    cores: str,
+    conda_frontend: Optional[str],
+    snakemake_args: Iterable[str],
+    in_process: bool = False,
+    check: bool = True,
+    config_overrides: Iterable[str] = (),
+) -> int:
     """Build an article in the current working directory."""
+    # These are all passed using a single '--config' argument since snakemake
+    # only respects the last one.
+    config_overrides = list(config_overrides)
     if verbose:
-        snakemake_args = list(snakemake_args) + ["--config", "verbose=True"]
+        config_overrides.append("verbose=True")
+    if config_overrides:
+        snakemake_args = list(snakemake_args) + ["--config"] + config_overrides
 
-    run_snakemake(
+    return run_snakemake(
         paths.package_data("showyourwork2", "workflow", "Snakefile"),
         config_file=configfile,
         cores=cores,
         conda_frontend=conda_frontend,
-        check=True,
+        check=check,
         extra_args=snakemake_args,
+        in_process=in_process,
     )
 
 
@@ -155,8 +295,18 @@ def get_config_file_and_project_root(
     snakemake_args: Iterable[str] = (), config_file: Optional[paths.PathLike] = None
 ) -> Tuple[Path, Path, Iterable[str]]:
     if config_file is None:
+        # Parsing the arguments and searching for the project root is relatively
+        # expensive so we cache the results between invocations. The results
+        # depend on the working directory and the arguments.
+        key = cache.cache_key(os.getcwd(), list(snakemake_args))
+        cached = cache.load("project_root", key)
+        if cached is not None and Path(cached["config_file"]).is_file():
+            return Path(cached["config_file"]), Path(cached["cwd"]), cached["targets"]
+
         # Parse the snakemake arguments using the snakemake parser to identify if
         # there are any targets included.
+        import snakemake
+
         snakemake_parser = snakemake.get_argument_parser()
         parsed_args = snakemake_parser.parse_args(list(snakemake_args))
 
@@ -173,12 +323,52 @@ def get_config_file_and_project_root(
                 "Please specify a configuration file using the '--configfile' command "
                 "line argument."
             )
+        cache.save(
+            "project_root",
+            key,
+            {"config_file": str(config_file), "cwd": str(cwd), "targets": target_paths},
+        )
     else:
         cwd = Path(config_file).parent
         target_paths = []
     return Path(config_file), cwd, target_paths
 
 
+def detect_conda_frontend() -> str:
+    """Use mamba as the conda frontend if it exists, otherwise use conda
+
+    The result only depends on the ``PATH``, so we cache it between invocations
+    and only re-run the (slow) check when the ``PATH`` changes or when the
+    previously detected executable no longer exists.
+    """
+    key = cache.cache_key(os.environ.get("PATH", ""))
+    cached = cache.load("conda_frontend", key)
+    if cached is not None:
+        executable = cached.get("executable")
+        if executable is None or Path(executable).exists():
+            return cached["frontend"]
+
+    from ensureconda.api import ensureconda
+
+    executable = ensureconda(
+        mamba=True,
+        micromamba=False,
+        conda=False,
+        conda_exe=False,
+        no_install=True,
+    )
+    frontend = "conda" if executable is None else "mamba"
+    cache.save(
+        "conda_frontend",
+        key,
+        {
+            "frontend": frontend,
+            "executable": None if executable is None else str(executable),
+        },
+    )
+    return frontend
+
+
 def run_snakemake(
     snakefile: paths.PathLike,
     config_file: Optional[paths.PathLike] = None,
@@ -186,6 +376,7 @@ def run_snakemake(
     conda_frontend: Optional[str] = None,
     check: bool = True,
     extra_args: Iterable[str] = (),
+    in_process: bool = False,
 ) -> int:
     # Find the project root (that's where we execute snakemake from), and the
     # configuration file there.
@@ -204,25 +395,9 @@ def run_snakemake(
     # handle any issues.
     if conda_frontend is None:
         # TODO(dfm): Log the result of this choice.
-        from ensureconda.api import ensureconda
-
-        if (
-            ensureconda(
-                mamba=True,
-                micromamba=False,
-                conda=False,
-                conda_exe=False,
-                no_install=True,
-            )
-            is not None
-        ):
-            conda_frontend = "mamba"
-        else:
-            conda_frontend = "conda"
-
-    env = dict(os.environ)
-    cmd = [
-        "snakemake",
+        conda_frontend = detect_conda_frontend()
+
+    args = [
         "--cores",
         f"{cores}",
         "--use-conda",
@@ -234,7 +409,41 @@ def run_snakemake(
         "-s",
         str(snakefile),
     ] + list(extra_args)
-    result = subprocess.run(cmd, env=env, check=False, cwd=cwd)
-    if check and result.returncode:
-        sys.exit(result.returncode)
-    return result.returncode
+    if in_process:
+        returncode = _run_snakemake_in_process(args, cwd)
+    else:
+        env = dict(os.environ)
+        cmd = ["snakemake"] + args
+        returncode = subprocess.run(cmd, env=env, check=False, cwd=cwd).returncode
+    if check and returncode:
+        sys.exit(returncode)
+    return returncode
+
+
+def _run_snakemake_in_process(args: List[str], cwd: Path) -> int:
+    """Execute snakemake using its Python entry point in the current process
+
+    This parses ``args`` exactly like the ``snakemake`` command line interface
+    does, but it avoids the cost of starting a new interpreter and re-importing
+    all of our dependencies. The exit code is captured from the ``SystemExit``
+    raised by snakemake so that the semantics match the subprocess version.
+    """
+    import snakemake
+
+    old_dir = os.getcwd()
+    os.chdir(cwd)
+    # The project root is cached based on the current working directory, so we
+    # need to reset it before the workflow is parsed.
+    paths.find_project_root.cache_clear()
+    try:
+        snakemake.main(args)
+    except SystemExit as e:
+        if e.code is None:
+            return 0
+        if isinstance(e.code, int):
+            return e.code
+        return 1
+    finally:
+        os.chdir(old_dir)
+        paths.find_project_root.cache_clear()
+    return 0
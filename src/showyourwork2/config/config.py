@@ -1,16 +1,25 @@
-from typing import Any, Dict, List, Tuple
+import os
+import sys
+from functools import lru_cache
+from importlib import import_module
+from typing import Any, Dict, List, Tuple, Type
 
 import yaml
-from pydantic import create_model
+from pydantic import ValidationError, create_model
 
+from showyourwork2 import cache
 from showyourwork2.config.models import Config
 from showyourwork2.paths import PathLike
 from showyourwork2.plugins import PluginManager
+from showyourwork2.version import __version__
+
+# Use the (much faster) libyaml-based loader if it is available
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
 
 def load_config(file: PathLike) -> Config:
     with open(file, "r") as f:
-        config = yaml.safe_load(f)
+        config = yaml.load(f, Loader=SafeLoader)
 
     if config is None:
         config = {}
@@ -19,15 +28,35 @@ def load_config(file: PathLike) -> Config:
 
 
 def normalize_keys(config: Any) -> Any:
-    if isinstance(config, dict):
-        result = {}
-        for k, v in config.items():
-            value = normalize_keys(v)
-            result[k.replace("-", "_")] = value
-        return result
-    elif isinstance(config, list):
-        return [normalize_keys(v) for v in config]
-    return config
+    """Replace dashes with underscores in all the keys of a nested config
+
+    A normalized copy of the input is returned. This is implemented iteratively
+    rather than recursively since generated config files can be very large.
+    """
+    if not isinstance(config, (dict, list)):
+        return config
+
+    result: Any = {} if isinstance(config, dict) else []
+    todo = [(config, result)]
+    while todo:
+        source, target = todo.pop()
+        items = source.items() if isinstance(source, dict) else enumerate(source)
+        for k, v in items:
+            if isinstance(v, dict):
+                value: Any = {}
+                todo.append((v, value))
+            elif isinstance(v, list):
+                value = []
+                todo.append((v, value))
+            else:
+                value = v
+            if isinstance(target, list):
+                target.append(value)
+            elif isinstance(k, str):
+                target[k.replace("-", "_")] = value
+            else:
+                target[k] = value
+    return result
 
 
 def parse_config(config: Dict[str, Any]) -> Tuple[Config, PluginManager]:
@@ -39,6 +68,39 @@ def parse_config(config: Dict[str, Any]) -> Tuple[Config, PluginManager]:
         plugins = ["showyourwork2.plugins.tex"] + list(plugins)
     config["plugins"] = plugins
 
+    plugin_manager, Config = _get_models(tuple(plugins))
+
+    # Validation can be expensive (e.g. plugins might call out to git), so we
+    # cache the validated config keyed on its contents, the environment, the
+    # versions of the plugins, and anything else that the plugins declare that
+    # they depend on. The validated config can contain paths into the
+    # environment (e.g. to themes), so it isn't shared between environments.
+    key = cache.cache_key(
+        config,
+        os.getcwd(),
+        sys.prefix,
+        sys.executable,
+        __version__,
+        [(p, getattr(import_module(p), "__version__", None)) for p in plugins],
+        plugin_manager.hook.config_cache_key(),
+    )
+    cached = cache.load_text("config", key)
+    if cached is not None:
+        try:
+            return (
+                Config.model_validate_json(cached, context={"cached": True}),
+                plugin_manager,
+            )
+        except ValidationError:
+            pass
+
+    result = Config.model_validate(config)
+    cache.save_text("config", key, result.model_dump_json())
+    return result, plugin_manager
+
+
+@lru_cache
+def _get_models(plugins: Tuple[str, ...]) -> Tuple[PluginManager, Type[Config]]:
     # Register all of the requested plugins first, since some might update the
     # configuration parsing.
     plugin_manager = PluginManager()
@@ -54,5 +116,4 @@ def parse_config(config: Dict[str, Any]) -> Tuple[Config, PluginManager]:
         __base__=tuple(plugin_manager.hook.config_model()),
         documents=(List[Document], []),  # type: ignore
     )
-
-    return Config.model_validate(config), plugin_manager
+    return plugin_manager, Config
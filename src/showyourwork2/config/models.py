@@ -1,9 +1,17 @@
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Type
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Type, Union
 
-from pydantic import BaseModel, ConfigDict, field_validator, model_validator
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    PositiveInt,
+    field_validator,
+    model_validator,
+)
 
+from showyourwork2.dependencies import DependencyGraph
 from showyourwork2.plugins.hooks import hookimpl
+from showyourwork2.utils import MaterializeStrategy
 from showyourwork2.version import __version__
 
 REQUIRED_CONFIG_VERSION = 2
@@ -20,6 +28,9 @@ class DynamicFile(BaseModel):
     conda: Optional[Path] = None
     input: List[Path] = []
     output: List[Path] = []
+    threads: PositiveInt = 1
+    resources: Dict[str, Union[int, str]] = {}
+    priority: int = 0
 
     @model_validator(mode="before")
     @classmethod
@@ -33,6 +44,16 @@ class DynamicFile(BaseModel):
         return data
 
 
+class PythonWorkers(BaseModel):
+    preload: List[str] = []
+    idle_timeout: float = 600.0
+
+
+class OutputCache(BaseModel):
+    directory: Optional[Path] = None
+    max_size_mb: PositiveInt = 1024
+
+
 class Document(BaseModel):
     path: Path
     dependencies: List[Path] = []
@@ -51,6 +72,10 @@ class Config(BaseModel):
 
     working_directory: Optional[Path] = None
     verbose: bool = False
+    profile: bool = False
+    materialize: MaterializeStrategy = "copy"
+    object_store: bool = True
+    fingerprints: bool = True
 
     plugins: List[str] = ["showyourwork2.plugins.tex"]
 
@@ -61,12 +86,20 @@ class Config(BaseModel):
     static: List[Path] = []
     dynamic: List[DynamicFile] = []
     scripts: Dict[str, str] = {}
+    python_workers: Optional[PythonWorkers] = None
+    output_cache: Optional[OutputCache] = None
     datasets: Dict[str, List[Path]] = {}
     snakefiles: List[Path] = []
 
+    # The list of documents is added dynamically by "parse_config" using the
+    # document models provided by the plugins.
+    if TYPE_CHECKING:
+        documents: List[Document] = []
+
     _document_dependencies: Dict[Path, List[Path]] = {}
     _dependency_tree: Dict[Path, List[Path]] = {}
     _dependency_tree_simple: Dict[Path, List[Path]] = {}
+    _dependency_graph: Optional[DependencyGraph] = None
 
     model_config = ConfigDict(extra="forbid")
 
@@ -81,6 +114,15 @@ class Config(BaseModel):
             )
         return config_version
 
+    @field_validator("python_workers", "output_cache", mode="before")
+    @classmethod
+    def allow_boolean_options(cls, value: Any) -> Any:
+        if value is True:
+            return {}
+        if value is False:
+            return None
+        return value
+
     @model_validator(mode="after")
     def expect_at_least_one_document(self) -> "Config":
         if not self.documents:
@@ -1,5 +1,18 @@
+import sys
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from typing import (
+    Any,
+    Callable,
+    Container,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
 
 
 def relative_or_skip(
@@ -14,11 +27,100 @@ def relative_or_skip(
         return None
 
 
-def get_including_directory(tree: Dict[str, List[str]], query: str) -> List[str]:
+class DirectoryIndex:
+    """A trie of path components used to find the key in a dependency tree that
+    is a parent directory of a query path
+
+    This is equivalent to checking ``Path(query).is_relative_to(key)`` for
+    every key in the tree, but the cost of a lookup only depends on the depth
+    of the query path rather than the number of keys. If multiple keys match,
+    the first one (in insertion order) is returned.
+    """
+
+    def __init__(self, keys: Iterable[str] = ()):
+        self.root = _TrieNode()
+        self.size = 0
+        for key in keys:
+            self.add(key)
+
+    def add(self, key: str) -> None:
+        node = self.root
+        for part in Path(key).parts:
+            node = node.children.setdefault(part, _TrieNode())
+        if node.key is None:
+            node.key = (self.size, key)
+            self.size += 1
+
+    def find(self, query: str) -> Optional[str]:
+        node = self.root
+        best = node.key
+        for part in Path(query).parts:
+            child = node.children.get(part)
+            if child is None:
+                break
+            node = child
+            if node.key is not None and (best is None or node.key < best):
+                best = node.key
+        return None if best is None else best[1]
+
+    def within(self, query: str) -> List[str]:
+        """All the keys that are equal to, or contained in, the query path"""
+        node = self.root
+        for part in Path(query).parts:
+            child = node.children.get(part)
+            if child is None:
+                return []
+            node = child
+        result = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node.key is not None:
+                result.append(node.key[1])
+            stack.extend(node.children.values())
+        return result
+
+
+class _TrieNode:
+    __slots__ = ("children", "key")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, _TrieNode] = {}
+        self.key: Optional[Tuple[int, str]] = None
+
+
+def dependency_tree_from_dag(dag: Any) -> Dict[str, List[str]]:
+    """Map every output of the jobs in a snakemake DAG to the sorted list of the
+    inputs of the job that produces it
+
+    This is built in a single pass over the jobs. All the paths are interned, so
+    that each file is only stored once even if it is an input to many jobs, and
+    the outputs of a job share the same list of inputs.
+    """
+    tree: Dict[str, List[str]] = {}
+    for job in dag.jobs:
+        inputs = sorted({sys.intern(str(f)) for f in job.input})
+        for output in job.output:
+            key = sys.intern(str(output))
+            existing = tree.get(key)
+            if existing is None:
+                tree[key] = inputs
+            else:
+                tree[key] = sorted(set(existing).union(inputs))
+    return tree
+
+
+def get_including_directory(
+    tree: Dict[str, List[str]], query: str, index: Optional[DirectoryIndex] = None
+) -> List[str]:
     if query in tree:
         return tree[query]
 
     # If the query is not in the tree, then it might be a file in a directory
+    if index is not None:
+        key = index.find(query)
+        return [] if key is None else tree[key]
+
     path = Path(query)
     for key in tree:
         # TODO(dfm): Would we ever expect there to be multiple rules that would
@@ -32,22 +134,204 @@ def get_including_directory(tree: Dict[str, List[str]], query: str) -> List[str]
     return []
 
 
+class DependencyGraph:
+    """A graph of the files produced by a workflow and the files they depend on
+
+    The graph is constructed from a "full" dependency tree mapping each output
+    file to the list of its inputs. Inputs that aren't outputs of any rule can
+    still be contained in a directory output, in which case they depend on the
+    inputs of that directory. Files in the working directory (given by
+    ``skip_path``) are treated as intermediate files, and :meth:`simplify`
+    collapses them out of the graph.
+
+    The set of project files that each node resolves to is memoized, and
+    :meth:`update` only invalidates the nodes downstream of the changed file,
+    so the simplified tree can be kept up to date cheaply. A ``ValueError``
+    listing the offending files is raised if a dependency cycle is found.
+    """
+
+    def __init__(
+        self, full_tree: Dict[str, List[str]], skip_path: Optional[Path] = None
+    ):
+        self.skip_path = skip_path
+        self.tree: Dict[str, List[str]] = {}
+        self.index = DirectoryIndex()
+        self.references = DirectoryIndex()
+        self.referrers: Dict[str, Set[str]] = {}
+        self._relative: Dict[str, Optional[str]] = {}
+        self._leaves: Dict[str, FrozenSet[str]] = {}
+        self._simplified: Dict[str, Set[str]] = {}
+        self._dirty: Set[str] = set()
+        for file, parents in full_tree.items():
+            self._set_parents(file, parents)
+
+    def relative_path(self, query: str) -> Optional[str]:
+        if query not in self._relative:
+            self._relative[query] = relative_or_skip(query, self.skip_path)
+        return self._relative[query]
+
+    def node_for(self, query: str) -> Optional[str]:
+        """The key in the tree that provides a file, if any"""
+        if query in self.tree:
+            return query
+        return self.index.find(query)
+
+    def dependents(self, query: str) -> Set[str]:
+        """The files that directly depend on a file"""
+        result: Set[str] = set()
+        for ref in self.references.within(query):
+            if ref == query or self.node_for(ref) == query:
+                result |= self.referrers[ref]
+        return result
+
+    def downstream(self, files: Iterable[str]) -> Set[str]:
+        """All the files that depend, directly or indirectly, on any of the
+        given files
+        """
+        result: Set[str] = set()
+        todo = list(files)
+        while todo:
+            for child in self.dependents(todo.pop()):
+                if child not in result:
+                    result.add(child)
+                    todo.append(child)
+        return result
+
+    def topological_order(self) -> List[str]:
+        """All the outputs in the tree, ordered so that every file comes after
+        the files that it depends on
+        """
+        done: Set[str] = set()
+        order = []
+        for file in self.tree:
+            for node in self._postorder(file, self._parents, done):
+                done.add(node)
+                order.append(node)
+        return order
+
+    def update(self, file: str, parents: List[str]) -> Set[str]:
+        """Add a file to the graph or replace its list of inputs
+
+        Returns the set of files whose entries in the simplified tree might
+        have changed.
+        """
+        self._set_parents(file, parents)
+        affected = self.downstream([file]) | {file}
+        for node in affected:
+            self._leaves.pop(node, None)
+            if node in self._simplified:
+                self._dirty.add(node)
+        return {n for n in affected if n in self._simplified}
+
+    def simplify(self) -> Dict[str, List[str]]:
+        """Collapse all the intermediate files out of the graph
+
+        The result maps each file outside of the working directory to the
+        sorted list of files outside of the working directory that it depends
+        on.
+        """
+        for file in self._dirty:
+            deps: Set[str] = set()
+            for parent in self.tree[file]:
+                qpath = self.relative_path(parent)
+                if qpath is None:
+                    deps |= self.leaves(parent)
+                else:
+                    deps.add(qpath)
+            self._simplified[file] = deps
+        self._dirty.clear()
+        result: Dict[str, List[str]] = {}
+        for file, deps in self._simplified.items():
+            path = self.relative_path(file)
+            assert path is not None
+            result[path] = list(sorted(deps))
+        return result
+
+    def leaves(self, query: str) -> FrozenSet[str]:
+        """The set of files outside of the working directory that an
+        intermediate file depends on
+        """
+        node = self.node_for(query)
+        if node is None:
+            return frozenset()
+        for current in self._postorder(node, self._intermediate_parents, self._leaves):
+            result: Set[str] = set()
+            for parent in self.tree[current]:
+                qpath = self.relative_path(parent)
+                if qpath is not None:
+                    result.add(qpath)
+                else:
+                    parent_node = self.node_for(parent)
+                    if parent_node is not None:
+                        result |= self._leaves[parent_node]
+            self._leaves[current] = frozenset(result)
+        return self._leaves[node]
+
+    def _set_parents(self, file: str, parents: List[str]) -> None:
+        for parent in self.tree.get(file, []):
+            self.referrers[parent].discard(file)
+        if file not in self.tree:
+            self.index.add(file)
+        self.tree[file] = list(parents)
+        for parent in parents:
+            if parent not in self.referrers:
+                self.references.add(parent)
+                self.referrers[parent] = set()
+            self.referrers[parent].add(file)
+        if self.relative_path(file) is not None:
+            self._simplified.setdefault(file, set())
+            self._dirty.add(file)
+
+    def _parents(self, node: str) -> Iterator[str]:
+        for parent in self.tree[node]:
+            parent_node = self.node_for(parent)
+            if parent_node is not None:
+                yield parent_node
+
+    def _intermediate_parents(self, node: str) -> Iterator[str]:
+        for parent in self.tree[node]:
+            if self.relative_path(parent) is None:
+                parent_node = self.node_for(parent)
+                if parent_node is not None:
+                    yield parent_node
+
+    def _postorder(
+        self,
+        start: str,
+        parents: Callable[[str], Iterator[str]],
+        done: Container[str],
+    ) -> Iterator[str]:
+        # An iterative depth-first traversal that yields each node after all of
+        # its parents. The caller is responsible for adding the yielded nodes
+        # to "done", and the nodes on the stack are used to report cycles.
+        if start in done:
+            return
+        stack = [(start, parents(start))]
+        on_stack = {start}
+        while stack:
+            current, pending = stack[-1]
+            for parent in pending:
+                if parent in done:
+                    continue
+                if parent in on_stack:
+                    cycle = [n for n, _ in stack]
+                    cycle = cycle[cycle.index(parent) :] + [parent]
+                    raise ValueError(f"Dependency cycle detected: {' -> '.join(cycle)}")
+                on_stack.add(parent)
+                stack.append((parent, parents(parent)))
+                break
+            else:
+                stack.pop()
+                on_stack.discard(current)
+                yield current
+
+
 def simplify_dependency_tree(
     full_tree: Dict[str, List[str]], skip_path: Optional[Path] = None
 ) -> Dict[str, List[str]]:
-    tree: Dict[str, Set[str]] = {}
-    for file, parents in full_tree.items():
-        path = relative_or_skip(file, skip_path)
-        if path is None:
-            continue
-        tree[str(path)] = set()
-        for parent in parents:
-            todo = [parent]
-            while len(todo):
-                query = todo.pop()
-                qpath = relative_or_skip(query, skip_path)
-                if qpath is None:
-                    todo += get_including_directory(full_tree, query)
-                else:
-                    tree[str(path)] |= {str(qpath)}
-    return {k: list(sorted(v)) for k, v in tree.items()}
+    """Collapse all the intermediate files in the working directory (given by
+    ``skip_path``) out of a dependency tree
+
+    See :class:`DependencyGraph` for more details.
+    """
+    return DependencyGraph(full_tree, skip_path).simplify()
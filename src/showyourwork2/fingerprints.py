@@ -0,0 +1,289 @@
+"""
+Content fingerprints for the inputs and outputs of jobs.
+
+Snakemake decides which jobs to rerun by comparing modification times, so a
+fresh checkout, or a file that is regenerated with the same contents, causes
+everything downstream to be rebuilt. To avoid this, the content hash, size and
+modification time of the inputs and outputs of each job are recorded when it
+finishes. Before the next build, any generated file in the working directory
+whose contents match its most recent record, but whose modification time
+doesn't, gets its recorded time back, so Snakemake sees the same state as when
+those contents were last used. The modification times of files outside of the
+working directory (e.g. the user's source files) are never changed.
+
+Once a job runs, Snakemake still runs every job downstream of it, even if its
+outputs didn't change. To stop this ("early cutoff"), a command can be wrapped
+with this module, executed by path, so that it is skipped when the command and
+the contents of its inputs are the same as the last time it succeeded. Since
+Snakemake deletes the outputs of a job before running it, the outputs are saved
+next to the record, and restored when the command is skipped::
+
+    python fingerprints.py RECORD --input A B --output C -- COMMAND ARGS...
+
+This module only depends on the standard library, so that it can be executed
+from the environment of any job.
+"""
+
+import hashlib
+import json
+import os
+import shlex
+import shutil
+import stat
+import subprocess
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+# The content hash, size and modification time of a file
+Fingerprint = Tuple[str, int, int]
+
+
+def fingerprint(
+    path: str, known: Optional[Fingerprint] = None
+) -> Optional[Fingerprint]:
+    """Get the fingerprint of a file, or ``None`` if it isn't a file
+
+    Symbolic links are followed to hash their target, but the modification time
+    is that of the link itself, like Snakemake. If ``known`` has the same size
+    and modification time, its hash is reused instead of reading the file.
+    """
+    try:
+        info = os.stat(path)
+        mtime = os.lstat(path).st_mtime_ns
+    except OSError:
+        return None
+    if not stat.S_ISREG(info.st_mode):
+        return None
+    if known is not None and (known[1], known[2]) == (info.st_size, mtime):
+        return known
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest(), info.st_size, mtime
+
+
+class FingerprintStore:
+    def __init__(self, root: Union[str, "os.PathLike[str]"]):
+        self.root = os.fspath(root)
+        self._known: Dict[str, Fingerprint] = {}
+
+    def restore_mtimes(self, directory: Union[str, "os.PathLike[str]"]) -> List[str]:
+        """Restore the modification times of files that haven't changed
+
+        Only the files in ``directory`` are updated, without following symbolic
+        links out of it. Each file is compared to the most recent record of it,
+        from any job, and the paths of the files that were updated are returned.
+        """
+        directory = os.path.realpath(directory)
+        latest: Dict[str, Fingerprint] = {}
+        for record in self._job_records():
+            for path, (digest, size, mtime) in record.items():
+                if path not in latest or mtime > latest[path][2]:
+                    latest[path] = (digest, size, mtime)
+
+        restored = []
+        for path, entry in latest.items():
+            current = fingerprint(path, entry)
+            if current is None or current == entry:
+                self._known[path] = entry
+                continue
+            if current[:2] == entry[:2] and _is_within(path, directory):
+                try:
+                    os.utime(path, ns=(entry[2], entry[2]), follow_symlinks=False)
+                except (OSError, NotImplementedError):
+                    continue
+                restored.append(path)
+                current = entry
+            self._known[path] = current
+        return restored
+
+    def record_job(self, key: str, paths: Iterable[str]) -> None:
+        """Record the fingerprints of the inputs and outputs of a finished job"""
+        entries = {}
+        for path in paths:
+            entry = fingerprint(path, self._known.get(path))
+            if entry is not None:
+                entries[path] = self._known[path] = entry
+        name = hashlib.sha256(key.encode()).hexdigest()[:16]
+        _write_json(os.path.join(self.root, "jobs", f"{name}.json"), entries)
+
+    def skip_unchanged(
+        self, name: str, extra_inputs: Iterable[Union[str, "os.PathLike[str]"]] = ()
+    ) -> str:
+        """Get a prefix for a shell command that skips it if nothing changed
+
+        The prefix uses Snakemake's ``{input}`` and ``{output}`` placeholders,
+        and the command must be a simple command with arguments. Any files that
+        the command reads but that aren't inputs of the rule (e.g. files staged
+        next to its inputs, or its conda environment file) can be listed in
+        ``extra_inputs``.
+        """
+        args = [sys.executable, os.path.abspath(__file__)]
+        args.append(os.path.join(os.path.abspath(self.root), "cutoff", name))
+        args += ["--input", *(os.fspath(path) for path in extra_inputs)]
+        prefix = shlex.join(args).replace("{", "{{").replace("}", "}}")
+        return f"{prefix} {{input:q}} --output {{output:q}} -- "
+
+    def _job_records(self) -> Iterable[Dict[str, List[Any]]]:
+        directory = os.path.join(self.root, "jobs")
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            return
+        for name in names:
+            try:
+                with open(os.path.join(directory, name)) as f:
+                    yield json.load(f)
+            except (OSError, ValueError):
+                continue
+
+
+def run(record: str, inputs: List[str], outputs: List[str], command: List[str]) -> int:
+    """Run a command, unless it and its inputs are unchanged since it last ran
+
+    When the command is skipped, its outputs are restored from the copies that
+    were saved the last time that it succeeded.
+    """
+    # Snakemake can list the same input more than once
+    inputs = list(dict.fromkeys(inputs))
+    saved = [os.path.join(record, str(n)) for n in range(len(outputs))]
+    try:
+        with open(f"{record}.json") as f:
+            previous = json.load(f)
+    except (OSError, ValueError):
+        previous = None
+
+    if previous is not None and _unchanged(previous, inputs, outputs, command):
+        try:
+            for src, dst in zip(saved, outputs):
+                _link_or_copy(src, dst)
+        except OSError:
+            pass
+        else:
+            name = os.path.basename(record)
+            print(
+                f"Skipping '{name}' since its inputs haven't changed", file=sys.stderr
+            )
+            return 0
+
+    # Remove the record first, so that it can't be used if the command fails
+    if previous is not None:
+        os.unlink(f"{record}.json")
+    returncode = subprocess.call(command)
+    if returncode != 0:
+        return returncode
+
+    entries = {path: fingerprint(path) for path in inputs}
+    if any(entry is None for entry in entries.values()):
+        return 0
+    os.makedirs(record, exist_ok=True)
+    for src, dst in zip(outputs, saved):
+        if fingerprint(src) is None:
+            return 0
+        _link_or_copy(src, dst)
+    _write_json(
+        f"{record}.json", {"command": command, "inputs": entries, "outputs": outputs}
+    )
+    return 0
+
+
+def _unchanged(
+    previous: Dict[str, Any], inputs: List[str], outputs: List[str], command: List[str]
+) -> bool:
+    if previous["command"] != command or previous["outputs"] != outputs:
+        return False
+    if set(previous["inputs"]) != set(inputs):
+        return False
+    for path, (digest, size, mtime) in previous["inputs"].items():
+        current = fingerprint(path, (digest, size, mtime))
+        if current is None or current[:2] != (digest, size):
+            return False
+    return True
+
+
+def _is_within(path: str, directory: str) -> bool:
+    # The parent is resolved so that links out of the directory aren't followed,
+    # but the file itself can be a link, since its own time is updated
+    parent = os.path.realpath(os.path.dirname(os.path.abspath(path)))
+    return os.path.commonpath([parent, directory]) == directory
+
+
+def _link_or_copy(src: str, dst: str) -> None:
+    # Hard links are safe here since Snakemake deletes outputs before running
+    # a job, instead of writing to them in place
+    if os.path.lexists(dst):
+        os.unlink(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+def _write_json(path: str, data: Any) -> None:
+    # Write to a temporary file first, so that a record is never partial
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def enable_fingerprints(
+    store: FingerprintStore, directory: Union[str, "os.PathLike[str]"]
+) -> None:
+    """Restore unchanged files, and record the files used by each finished job
+
+    The modification times of the files in ``directory`` (usually the working
+    directory) are restored before Snakemake builds its DAG, and
+    the fingerprints are recorded by a log handler, after Snakemake has touched
+    the outputs of each job. Nothing is done during a dry run, or when the
+    Snakefile is parsed by a job that Snakemake runs in a subprocess, so that
+    files are never modified while other jobs are running.
+    """
+    import snakemake
+    from snakemake.common import Mode
+
+    snakemake_logger = snakemake.logging.logger
+    if snakemake_logger.dryrun or snakemake_logger.mode != Mode.default:
+        return
+
+    store.restore_mtimes(directory)
+    jobs: Dict[int, Tuple[List[str], List[str]]] = {}
+
+    def handler(msg: Dict[str, Any]) -> None:
+        level = msg["level"]
+        if level == "job_info":
+            inputs = list(map(str, msg.get("input", [])))
+            outputs = list(map(str, msg.get("output", [])))
+            jobs[msg["jobid"]] = (inputs, outputs)
+        elif level in ("job_finished", "job_error"):
+            job = jobs.pop(msg.get("jobid", None), None)
+            if job is not None and level == "job_finished":
+                inputs, outputs = job
+                store.record_job("\0".join(sorted(outputs)), inputs + outputs)
+
+    snakemake_logger.log_handler.append(handler)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = sys.argv[1:] if argv is None else argv
+    if "--" not in args:
+        raise ValueError("No command was provided")
+    index = args.index("--")
+    record, *options = args[:index]
+    command = args[index + 1 :]
+    paths: Dict[str, List[str]] = {"--input": [], "--output": []}
+    current = None
+    for option in options:
+        if option in paths:
+            current = paths[option]
+        elif current is None:
+            raise ValueError(f"Unknown option: '{option}'")
+        else:
+            current.append(option)
+    return run(record, paths["--input"], paths["--output"], command)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+import atexit
+import json
+import os
+from pathlib import Path
+from shutil import rmtree
+from typing import Any, Dict, List, Set
+
+import snakemake
+
+from showyourwork2 import paths
+from showyourwork2.config.models import Config
+from showyourwork2.logging import get_logger
+
+
+def load_manifest(manifest_file: paths.PathLike) -> List[str]:
+    try:
+        with open(manifest_file, "r") as f:
+            return list(json.load(f))
+    except (OSError, ValueError):
+        return []
+
+
+def record_outputs(config: Config) -> None:
+    """Register a snakemake log handler that records the outputs of all jobs
+
+    The outputs of each scheduled job are collected, and merged with any that
+    were recorded by previous builds. The manifest is written once all the jobs
+    have finished, when a job fails, or when the process exits. Nothing is
+    recorded during a dry run.
+    """
+    snakemake_logger = snakemake.logging.logger
+    if snakemake_logger.dryrun:
+        return
+
+    manifest_file = paths.work(config.working_directory).manifest
+    outputs: Set[str] = set(load_manifest(manifest_file))
+    new_outputs: Set[str] = set()
+
+    def write() -> None:
+        if not new_outputs:
+            return
+        outputs.update(new_outputs)
+        new_outputs.clear()
+        with open(manifest_file, "w") as f:
+            json.dump(list(sorted(outputs)), f, indent=2)
+
+    def handler(msg: Dict[str, Any]) -> None:
+        level = msg["level"]
+        if level == "job_info":
+            new_outputs.update(set(map(str, msg.get("output", []))) - outputs)
+        elif level == "job_error" or (
+            level == "progress" and msg["done"] == msg["total"]
+        ):
+            write()
+
+    snakemake_logger.log_handler.append(handler)
+    atexit.register(write)
+
+
+def delete_outputs(manifest_file: paths.PathLike, project_root: paths.PathLike) -> None:
+    """Delete all the outputs listed in a manifest, and then the manifest itself
+
+    Any paths that aren't within the project root are skipped. Symbolic links
+    are deleted themselves, and never followed, since outputs can be links to
+    source files or to objects shared by other outputs. For the same reason,
+    outputs inside a linked directory are skipped.
+    """
+    logger = get_logger()
+    project_root = Path(project_root).resolve()
+    for output in load_manifest(manifest_file):
+        path = Path(os.path.normpath(project_root / output))
+        if (
+            path == project_root
+            or not path.is_relative_to(project_root)
+            or path.parent.resolve() != path.parent
+        ):
+            logger.warning(f"Skipping output outside of project: {output}")
+            continue
+        if path.is_dir() and not path.is_symlink():
+            logger.info(f"Deleting {output}")
+            rmtree(path)
+        elif os.path.lexists(path):
+            logger.info(f"Deleting {output}")
+            os.unlink(path)
+    Path(manifest_file).unlink()
@@ -0,0 +1,89 @@
+"""
+Execute Jupyter notebooks without starting a Jupyter kernel.
+
+Running ``jupyter execute`` starts a new kernel for each notebook, which can take
+longer than running the notebook itself. Instead, this module runs the code
+cells of a notebook in an IPython shell in the current process, from the
+directory containing the notebook, and reports how long each cell took on
+standard error. Like ``jupyter execute``, the outputs of the cells aren't saved,
+and execution stops at the first cell that raises an exception, unless that cell
+is tagged with ``raises-exception``. Cells tagged with ``skip-execution`` are
+skipped.
+
+This is most useful together with ``worker.py``, which runs each notebook in a
+fresh fork of a server that has already imported IPython (and any other
+preloaded modules), so notebooks start quickly and can't affect each other::
+
+    python worker.py --preload IPython notebook.py NOTEBOOK
+
+Like the worker, this module is executed by path, so that it can be used from
+any environment where IPython is installed.
+"""
+
+import json
+import os
+import sys
+import time
+from typing import Any, List, Optional
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = sys.argv[1:] if argv is None else argv
+    if not args:
+        raise ValueError("No notebook was provided")
+    return execute(args[0])
+
+
+def execute(path: str) -> int:
+    """Execute the code cells in a notebook, and return an exit status"""
+    # Set up the process like a kernel started by "jupyter execute", without
+    # the modules next to this file (e.g. "logging.py") on the path
+    here = os.path.dirname(os.path.abspath(__file__))
+    sys.path[:] = [p for p in sys.path if os.path.abspath(p or ".") != here]
+    sys.path.insert(0, "")
+
+    from IPython.core.interactiveshell import InteractiveShell
+    from traitlets.config import Config
+
+    path = os.path.abspath(path)
+    name = os.path.basename(path)
+    with open(path, encoding="utf-8") as f:
+        cells = json.load(f).get("cells", [])
+
+    os.chdir(os.path.dirname(path))
+    os.environ.setdefault("MPLBACKEND", "Agg")
+
+    # Don't display the value of the last expression in each cell, and keep
+    # the history in memory so that parallel notebooks don't share a database
+    config = Config()
+    config.HistoryManager.enabled = False
+    config.InteractiveShell.colors = "NoColor"
+    config.InteractiveShell.ast_node_interactivity = "none"
+    shell: Any = InteractiveShell.instance(config=config)
+
+    start = time.perf_counter()
+    for index, cell in enumerate(cells):
+        tags = cell.get("metadata", {}).get("tags", [])
+        if cell.get("cell_type") != "code" or "skip-execution" in tags:
+            continue
+        source = cell.get("source", "")
+        if isinstance(source, list):
+            source = "".join(source)
+        cell_start = time.perf_counter()
+        result = shell.run_cell(source, store_history=True)
+        elapsed = time.perf_counter() - cell_start
+        if not result.success and "raises-exception" not in tags:
+            _log(f"{name}: cell {index} failed after {elapsed:.2f}s")
+            return 1
+        _log(f"{name}: cell {index} finished in {elapsed:.2f}s")
+    _log(f"{name}: finished in {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+def _log(message: str) -> None:
+    sys.stdout.flush()
+    print(message, file=sys.stderr, flush=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
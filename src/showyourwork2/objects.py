@@ -0,0 +1,102 @@
+"""
+A content-addressed store for files that are copied to several places in the
+working directory.
+
+Each document gets its own build trees, and files that are shared by several
+documents (like figures) would otherwise be copied into each of them. Instead,
+the contents of each file are stored once, as a read-only object named by its
+SHA-256 hash, and the copies are relative symbolic links to that object.
+
+Snakemake follows symbolic links when it compares modification times, so each
+link appears as old as its object. Objects are never touched, since that would
+make every other link to them appear updated. Instead, when an object is older
+than the file being linked (e.g. when a file goes back to contents that were
+seen before), the file is cloned or copied from the object, so that it still
+appears newer than anything built from its previous contents.
+
+Objects are never removed during a build, so the store grows with every
+version of every linked file, until it is deleted by ``showyourwork2 clean``.
+"""
+
+import hashlib
+import os
+import stat
+import threading
+from pathlib import Path
+from typing import Dict, Tuple
+
+from showyourwork2.paths import PathLike
+from showyourwork2.utils import copy_file_or_directory
+
+# The hashes of files, keyed by their path and stat metadata, so that a file
+# that is linked into several places is only read once per process
+_hashes: Dict[Tuple[str, int, int, int], str] = {}
+_lock = threading.Lock()
+
+
+def hash_file(path: PathLike) -> str:
+    path = os.path.realpath(path)
+    info = os.stat(path)
+    key = (path, info.st_ino, info.st_size, info.st_mtime_ns)
+    with _lock:
+        digest = _hashes.get(key)
+    if digest is None:
+        hasher = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                hasher.update(chunk)
+        digest = hasher.hexdigest()
+        with _lock:
+            _hashes[key] = digest
+    return digest
+
+
+class ObjectStore:
+    def __init__(self, root: PathLike):
+        self.root = Path(root)
+
+    def object_path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest[2:]
+
+    def add(self, file: PathLike) -> Path:
+        """Add a file to the store, returning the path to its object"""
+        obj = self.object_path(hash_file(file))
+        if not obj.exists():
+            obj.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a unique temporary file first, so that concurrent jobs
+            # never see a partial object
+            tmp = obj.with_name(f".{obj.name}.{os.getpid()}.{threading.get_ident()}")
+            copy_file_or_directory(file, tmp, strategy="reflink")
+            os.chmod(tmp, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+            os.replace(tmp, obj)
+        return obj
+
+    def link(self, src: PathLike, dst: PathLike) -> None:
+        """Materialize a file or directory as links to objects in the store
+
+        Directories are recreated, with a link for each file. If links aren't
+        supported, the objects are copied instead.
+        """
+        src = Path(src)
+        dst = Path(dst)
+        if not src.is_dir():
+            self._link_file(src, dst)
+            return
+        for dirpath, _, filenames in os.walk(src):
+            target = dst / Path(dirpath).relative_to(src)
+            target.mkdir(parents=True, exist_ok=True)
+            for filename in filenames:
+                self._link_file(Path(dirpath) / filename, target / filename)
+
+    def _link_file(self, src: Path, dst: Path) -> None:
+        obj = self.add(src)
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        if os.path.lexists(dst):
+            os.unlink(dst)
+        if obj.stat().st_mtime_ns >= src.stat().st_mtime_ns:
+            try:
+                os.symlink(os.path.relpath(obj, dst.parent), dst)
+                return
+            except OSError:
+                pass
+        copy_file_or_directory(obj, dst, strategy="reflink")
@@ -107,6 +107,18 @@ class work(PathMeta):
     def dependencies(self) -> Path:
         return self.root / "dependencies.json"
 
+    @property
+    def manifest(self) -> Path:
+        return self.root / "manifest.json"
+
+    @property
+    def objects(self) -> Path:
+        return self.root / "objects"
+
+    @property
+    def fingerprints(self) -> Path:
+        return self.root / "fingerprints"
+
     @cached_property
     def build(self) -> Path:
         return self.subdir("build")
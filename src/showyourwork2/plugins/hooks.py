@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 import pluggy
 from pydantic import BaseModel
@@ -27,6 +27,11 @@ def document_model() -> BaseModel:
     raise NotImplementedError
 
 
+@hookspec
+def config_cache_key() -> Any:
+    raise NotImplementedError
+
+
 @hookspec
 def rule_priority(rule: "snakemake.ruleinfo.RuleInfo") -> int:
     del rule
@@ -4,3 +4,9 @@ from showyourwork2.plugins.staging import stages
 sywplug_staging__rule_name = partial(
     utils.rule_name, plugin="showyourwork2.plugins.staging"
 )
+
+# The staging rules can also be used without showyourwork, in which case the
+# config is Snakemake's config dictionary
+sywplug_staging__materialize = (
+    config.get("materialize", "copy") if isinstance(config, dict) else config.materialize
+)
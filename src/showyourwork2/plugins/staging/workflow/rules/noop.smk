@@ -45,8 +45,10 @@ for name, stage in stages.STAGES.items():
                     stage.directory / staged_filename
                 output:
                     filename
+                params:
+                    strategy=sywplug_staging__materialize,
                 run:
-                    utils.copy_file_or_directory(input[0], output[0])
+                    utils.copy_file_or_directory(input[0], output[0], strategy=params.strategy)
 
         else:
             rule:
@@ -58,5 +60,7 @@ for name, stage in stages.STAGES.items():
                     filename
                 output:
                     stage.directory / staged_filename
+                params:
+                    strategy=sywplug_staging__materialize,
                 run:
-                    utils.copy_file_or_directory(input[0], output[0])
+                    utils.copy_file_or_directory(input[0], output[0], strategy=params.strategy)
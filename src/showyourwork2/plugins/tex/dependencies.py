@@ -1,13 +1,19 @@
+import logging
+import os
 import re
 from pathlib import Path
-from typing import Iterable, List
+from typing import Dict, Iterable, Iterator, List, Optional, Set
 from xml.etree import ElementTree
 
 from showyourwork2 import paths
 from showyourwork2.config.models import Config
+from showyourwork2.dependencies import DirectoryIndex
 from showyourwork2.logging import get_logger
 from showyourwork2.utils import json_dump
 
+# The number of characters read from the XML log at a time
+CHUNK_SIZE = 1 << 16
+
 
 def parse_dependencies(
     from_xmlfile: paths.PathLike,
@@ -16,76 +22,171 @@ def parse_dependencies(
     project_root: paths.PathLike,
     config: Config,
 ) -> None:
-    logger = get_logger(config)
+    """Parse the XML log produced by the dependency pass into a JSON file
 
+    The log is parsed incrementally in a single pass, so memory usage doesn't
+    grow with the size of the log. Graphics are resolved relative to the
+    ``\\graphicspath`` in effect when they are included. When that lists
+    multiple directories, the first one containing the file (either on disk or
+    as an output of a dynamic rule) is used, falling back to the first
+    directory.
+    """
     base_path = Path(base_path).resolve()
-    data = Path(from_xmlfile).read_text()
-    xml_tree = ElementTree.fromstring("<HTML>" + data + "</HTML>")
-
-    # Parse the \graphicspath command
-    #
-    # Note that if there are multiple calls, only the last one is read. Same for
-    # multiple directories within a graphicspath call.
-    gpath_elements = xml_tree.findall("GRAPHICSPATH")
-    graphics_path = base_path
-    if len(gpath_elements) > 0:
-        if len(gpath_elements) > 1:
-            logger.warning(
-                "Multiple \\graphicspath commands found when parsing TeX document; "
-                "this can lead to undefined behavior"
-            )
-        text = gpath_elements[-1].text
-        if text is not None:
-            graphics_path = re.findall("\\{(.*?)\\}", text)[0]
-            graphics_path = base_path / graphics_path
-
-    # Extract all the figure dependencies
-    figures = {}
-    unlabeled_graphics = []
-    for figure in xml_tree.findall("FIGURE"):
+    resolver = GraphicsResolver(base_path, project_root, config)
+    dependencies = DependencyCollector(base_path, resolver, get_logger(config))
+    for element in iter_xml_log(from_xmlfile):
+        dependencies.add(element)
+
+    # Convert all the paths to be relative to the project root
+    def convert_paths(paths: Iterable[Path]) -> List[Path]:
+        return [f.relative_to(project_root) for f in paths]
+
+    figures = {k: convert_paths(v) for k, v in dependencies.figures.items()}
+    unlabeled_graphics = convert_paths(
+        dependencies.unlabeled_in_figures + dependencies.unlabeled_graphics
+    )
+    files = convert_paths(dependencies.files)
+
+    with open(depfile, "w") as f:
+        json_dump(
+            {"figures": figures, "unlabeled": unlabeled_graphics, "files": files}, f
+        )
+
+
+def iter_xml_log(from_xmlfile: paths.PathLike) -> Iterator[ElementTree.Element]:
+    """Iterate over the top level elements of an XML log file
+
+    The log is a sequence of elements without a root, so it is wrapped in an
+    ``HTML`` element. Each top level element is yielded once it has been
+    closed, and then discarded so that memory usage stays bounded.
+    """
+    parser = ElementTree.XMLPullParser(events=("start", "end"))
+    parser.feed("<HTML>")
+    root: Optional[ElementTree.Element] = None
+    depth = 0
+
+    def read_events() -> Iterator[ElementTree.Element]:
+        nonlocal root, depth
+        for event, element in parser.read_events():
+            if event == "start":
+                if root is None:
+                    root = element
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 1 and root is not None:
+                    yield element
+                    root.clear()
+
+    with open(from_xmlfile, "r") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), ""):
+            parser.feed(chunk)
+            yield from read_events()
+    parser.feed("</HTML>")
+    yield from read_events()
+    parser.close()
+
+
+class DependencyCollector:
+    """Collect the dependencies from the top level elements of an XML log
+    file
+    """
+
+    def __init__(
+        self, base_path: Path, resolver: "GraphicsResolver", logger: logging.Logger
+    ) -> None:
+        self.base_path = base_path
+        self.resolver = resolver
+        self.logger = logger
+        self.graphics_dirs: List[str] = []
+        self.figures: Dict[str, List[Path]] = {}
+        self.unlabeled_in_figures: List[Path] = []
+        self.unlabeled_graphics: List[Path] = []
+        self.files: List[Path] = []
+
+    def add(self, element: ElementTree.Element) -> None:
+        tag = element.tag
+        text = element.text
+        if tag == "FIGURE":
+            self.add_figure(element)
+        elif text is None:
+            return
+        elif tag == "GRAPHICSPATH":
+            self.graphics_dirs = re.findall("\\{(.*?)\\}", text)
+        elif tag == "GRAPHICS":
+            graphic = self.resolver.resolve(self.graphics_dirs, text)
+            self.unlabeled_graphics.append(graphic)
+        elif tag == "INPUT":
+            # Files included using the \\variable statement will be made
+            # explicit dependencies of the build
+            self.files.append(self.base_path / text)
+
+    def add_figure(self, figure: ElementTree.Element) -> None:
         graphics = [
-            graphics_path / graphic.text
+            self.resolver.resolve(self.graphics_dirs, graphic.text)
             for graphic in figure.findall("GRAPHICS")
             if graphic.text is not None
         ]
 
-        # Get the figure \label, if it exists
+        # Get the figure \\label, if it exists
         labels = figure.findall("LABEL")
         if len(labels):
             if len(labels) > 1:
-                logger.warning(
+                self.logger.warning(
                     "Multiple labels found for a single figure when parsing TeX "
                     "document; this is unsupported, and the first label will be used"
                 )
-            label = labels[0].text
-            figures[label] = graphics
+            self.figures[labels[0].text or ""] = graphics
         else:
-            unlabeled_graphics.extend(graphics)
-
-    # Find any other free-floating graphics
-    unlabeled_graphics.extend(
-        graphics_path / graphic.text
-        for graphic in xml_tree.findall("GRAPHICS")
-        if graphic.text is not None
-    )
+            self.unlabeled_in_figures.extend(graphics)
 
-    # Parse files included using the \input statement; these will be made
-    # explicit dependencies of the build
-    files = [
-        base_path / file.text
-        for file in xml_tree.findall("INPUT")
-        if file.text is not None
-    ]
 
-    # Convert all the paths to be relative to the project root
-    def convert_paths(paths: Iterable[Path]) -> List[Path]:
-        return [f.relative_to(project_root) for f in paths]
+class GraphicsResolver:
+    """Resolve included graphics against the directories in a
+    ``\\graphicspath``
 
-    figures = {k: convert_paths(v) for k, v in figures.items()}
-    unlabeled_graphics = convert_paths(unlabeled_graphics)
-    files = convert_paths(files)
+    A graphic is found in a directory if it exists on disk, or if it is (or is
+    contained in) an output of one of the dynamic rules in the config. The
+    directory listings are only read once, and the dynamic outputs are looked up
+    using a precomputed index, so the cost doesn't grow with the number of
+    directories or outputs.
+    """
 
-    with open(depfile, "w") as f:
-        json_dump(
-            {"figures": figures, "unlabeled": unlabeled_graphics, "files": files}, f
+    def __init__(
+        self, base_path: Path, project_root: paths.PathLike, config: Config
+    ) -> None:
+        self.base_path = base_path
+        self.project_root = Path(project_root)
+        self.outputs = DirectoryIndex(
+            str(self.project_root / output)
+            for dynamic in config.dynamic
+            for output in dynamic.output
         )
+        self._listings: Dict[Path, Set[str]] = {}
+        self._directories: Dict[str, Path] = {}
+
+    def exists(self, path: Path) -> bool:
+        if self.outputs.find(os.path.normpath(path)) is not None:
+            return True
+        directory = path.parent
+        if directory not in self._listings:
+            try:
+                self._listings[directory] = set(os.listdir(directory))
+            except OSError:
+                self._listings[directory] = set()
+        return path.name in self._listings[directory]
+
+    def directory(self, name: str) -> Path:
+        if name not in self._directories:
+            self._directories[name] = self.base_path / name
+        return self._directories[name]
+
+    def resolve(self, directories: List[str], graphic: str) -> Path:
+        if not directories:
+            return self.base_path / graphic
+        candidates = [self.directory(d) / graphic for d in directories]
+        if len(candidates) > 1:
+            for candidate in candidates:
+                if self.exists(candidate):
+                    return candidate
+        return candidates[0]
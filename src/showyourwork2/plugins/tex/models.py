@@ -1,6 +1,6 @@
 from functools import lru_cache
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Literal, Optional
 
 from pydantic import BaseModel, computed_field, model_validator  # type: ignore
 
@@ -24,6 +24,7 @@ class ThemeModel(BaseModel):
 class Document(BaseModel):
     build_tex: Optional[bool] = None
     synctex: bool = True
+    dependency_scanner: Literal["tectonic", "python"] = "tectonic"
     theme: ThemeModel = ThemeModel(
         path=package_data("showyourwork2.plugins.tex", "themes", "base")
     )
@@ -43,9 +44,14 @@ class Document(BaseModel):
     def generate_artifact_list(self) -> "Document":
         if not self.build_tex_:
             return self
-        self.artifacts.append(self.path.with_suffix(".pdf"))
+        artifacts = [self.path.with_suffix(".pdf")]
         if self.synctex:
-            self.artifacts.append(self.path.with_suffix(".synctex.gz"))
+            artifacts.append(self.path.with_suffix(".synctex.gz"))
+        for artifact in artifacts:
+            # The artifacts will already be included if this document is being
+            # loaded from the config cache
+            if artifact not in self.artifacts:
+                self.artifacts.append(artifact)
         return self
 
 
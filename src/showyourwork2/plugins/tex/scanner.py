@@ -0,0 +1,291 @@
+"""
+A native Python alternative to the ``tectonic`` pass that lists the dependencies
+of a TeX document.
+
+The scanner tokenizes the TeX sources directly, following ``\\input`` and
+``\\include``, and writes an XML log in the same format as the one produced by
+the ``dependencies.tex`` theme template, so the result can be processed by
+:func:`showyourwork2.plugins.tex.dependencies.parse_dependencies`. It tracks
+``\\includegraphics``, ``\\graphicspath``, ``\\label`` and ``\\variable``
+commands, and ``figure`` and ``figure*`` environments.
+
+Since this doesn't actually expand any TeX macros, the scanner gives up (by
+raising a ``ValueError``) when it finds a command that it can't resolve. This
+includes tracked commands with arguments that contain macros or parameters,
+macro definitions that use tracked commands, and inputs that don't exist in the
+project. Commands defined by the document class or packages, like the aastex
+``\\plotone``, can't be seen by the scanner, so it also gives up on figures that
+contain an unknown command with an argument that looks like a file name, or that
+don't include any graphics. The workflow then falls back to running
+``tectonic``. Customizations to the ``dependencies.tex`` template of a theme are
+not supported by the scanner.
+
+This module only depends on the standard library so that it can be executed
+cheaply as a script::
+
+    python scanner.py OUTPUT DOCUMENT
+"""
+
+import re
+import sys
+from pathlib import Path
+from typing import List, Optional, Set, Tuple
+from xml.sax.saxutils import escape
+
+FIGURE_ENVIRONMENTS = {"figure", "figure*"}
+VERBATIM_ENVIRONMENTS = {
+    "verbatim",
+    "verbatim*",
+    "Verbatim",
+    "lstlisting",
+    "minted",
+    "comment",
+}
+DEFINITIONS = {
+    "newcommand",
+    "renewcommand",
+    "providecommand",
+    "DeclareRobustCommand",
+    "NewDocumentCommand",
+    "RenewDocumentCommand",
+    "newenvironment",
+    "renewenvironment",
+    "def",
+    "gdef",
+    "edef",
+    "xdef",
+    "let",
+}
+# Commands with a single argument that is written directly to the log
+LOGGED = {"graphicspath": "GRAPHICSPATH", "label": "LABEL", "variable": "INPUT"}
+TRACKED = {"includegraphics", "input", "include"} | set(LOGGED)
+
+COMMAND = re.compile(r"\\([A-Za-z@]+|.)")
+COMMENT = re.compile(r"(\\.)|%[^\n]*", re.DOTALL)
+CONDITIONAL = re.compile(r"\\(if(?!thenelse)[A-Za-z@]*|fi)(?![A-Za-z@])")
+# Arguments like "figures/plot.pdf" which might be files used by a command
+FILE_LIKE = re.compile(r"[\w./-]+\.[A-Za-z]\w{0,4}")
+TRACKED_USE = re.compile(
+    r"\\(?:" + "|".join(sorted(TRACKED)) + r")(?![A-Za-z@])|\\begin\s*\{figure\*?\}"
+)
+
+
+def strip_comments(text: str) -> str:
+    return COMMENT.sub(lambda m: m.group(1) or "", text)
+
+
+class Scanner:
+    def __init__(self, document: Path):
+        self.base_path = document.parent
+        self.events: List[str] = [
+            "<!--XML article tree automatically generated by showyourwork-->"
+        ]
+        self.done = False
+        self._stack: Set[Path] = set()
+        # Whether each of the enclosing figures includes any graphics
+        self._figures: List[bool] = []
+        self.scan_file(document)
+
+    def emit(self, tag: str, text: Optional[str] = None) -> None:
+        if text is None:
+            self.events.append(f"<{tag}>")
+        else:
+            self.events.append(f"<{tag}>{escape(text)}</{tag}>")
+
+    def resolve_input(self, name: str) -> Path:
+        # TeX tries adding the ".tex" extension first
+        for candidate in (f"{name}.tex", name):
+            path = self.base_path / candidate
+            if path.is_file():
+                return path
+        raise ValueError(f"Could not resolve input '{name}'")
+
+    def scan_file(self, path: Path) -> None:
+        if path in self._stack:
+            raise ValueError(f"Recursive input of '{path}'")
+        self._stack.add(path)
+        self.scan(strip_comments(path.read_text()))
+        self._stack.discard(path)
+
+    def scan(self, text: str) -> None:
+        pos = 0
+        while not self.done:
+            match = COMMAND.search(text, pos)
+            if match is None:
+                return
+            name = match.group(1)
+            pos = match.end()
+
+            if name in ("begin", "end"):
+                pos = self.scan_environment(name, text, pos)
+
+            elif name == "iffalse":
+                pos = skip_conditional(text, pos)
+
+            elif name in DEFINITIONS:
+                pos = skip_definition(name, text, pos)
+
+            elif name == "includegraphics":
+                pos = skip_star_and_options(text, pos)
+                arg, pos = read_group(text, pos, resolved=True)
+                self.emit("GRAPHICS", arg)
+                if self._figures:
+                    self._figures[-1] = True
+
+            elif name in LOGGED:
+                arg, pos = read_group(text, pos, resolved=True)
+                self.emit(LOGGED[name], arg)
+
+            elif name in ("input", "include"):
+                arg, pos = read_group(text, pos, resolved=True, bare=name == "input")
+                self.scan_file(self.resolve_input(arg.strip()))
+
+            elif self._figures and FILE_LIKE.fullmatch(peek_group(text, pos) or ""):
+                raise ValueError(f"Could not resolve command '\\{name}' in a figure")
+
+    def scan_environment(self, name: str, text: str, pos: int) -> int:
+        env, pos = read_group(text, pos)
+        if name == "begin" and env in VERBATIM_ENVIRONMENTS:
+            end = text.find(f"\\end{{{env}}}", pos)
+            return len(text) if end < 0 else end
+        if env in FIGURE_ENVIRONMENTS:
+            if name == "begin":
+                self._figures.append(False)
+            elif self._figures and not self._figures.pop():
+                raise ValueError("Could not find the graphics included by a figure")
+            self.emit("FIGURE" if name == "begin" else "/FIGURE")
+        elif name == "end" and env == "document":
+            self.done = True
+        return pos
+
+    def to_xml(self) -> str:
+        return "\n".join(self.events) + "\n"
+
+
+def read_group(
+    text: str, pos: int, resolved: bool = False, bare: bool = False
+) -> Tuple[str, int]:
+    """Read a brace delimited argument starting at ``pos``
+
+    If ``resolved`` is true, the argument must not contain any macros or
+    parameters. If ``bare`` is true, an argument without braces is read up to
+    the next whitespace (like ``\\input file``).
+    """
+    start = pos
+    while pos < len(text) and text[pos].isspace():
+        pos += 1
+    if pos >= len(text) or text[pos] != "{":
+        if bare:
+            match = re.compile(r"[^\s{}\\]+").match(text, pos)
+            if match is not None:
+                return match.group(0), match.end()
+        raise ValueError(f"Could not parse argument: '{text[start:start + 40]}'")
+    depth = 0
+    end = pos
+    while end < len(text):
+        char = text[end]
+        if char == "\\":
+            end += 2
+            continue
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                arg = text[pos + 1 : end]
+                if resolved and ("\\" in arg or "#" in arg):
+                    raise ValueError(f"Could not resolve argument: '{arg}'")
+                return arg, end + 1
+        end += 1
+    raise ValueError(f"Unbalanced braces: '{text[start:start + 40]}'")
+
+
+def peek_group(text: str, pos: int) -> Optional[str]:
+    """Get the brace delimited argument starting at ``pos``, if there is one"""
+    try:
+        return read_group(text, pos)[0]
+    except ValueError:
+        return None
+
+
+def read_token(text: str, pos: int) -> int:
+    """Skip over a single brace delimited group, control sequence, or character"""
+    while pos < len(text) and text[pos].isspace():
+        pos += 1
+    if text.startswith("{", pos):
+        return read_group(text, pos)[1]
+    match = COMMAND.match(text, pos)
+    return pos + 1 if match is None else match.end()
+
+
+def skip_star_and_options(text: str, pos: int) -> int:
+    while pos < len(text) and text[pos].isspace():
+        pos += 1
+    if text.startswith("*", pos):
+        pos += 1
+    while True:
+        while pos < len(text) and text[pos].isspace():
+            pos += 1
+        if not text.startswith("[", pos):
+            return pos
+        end = text.find("]", pos)
+        if end < 0:
+            raise ValueError("Unbalanced brackets")
+        pos = end + 1
+
+
+def skip_conditional(text: str, pos: int) -> int:
+    """Skip to the end of a conditional block, accounting for nesting"""
+    depth = 1
+    for match in CONDITIONAL.finditer(text, pos):
+        depth += -1 if match.group(1) == "fi" else 1
+        if depth == 0:
+            return match.end()
+    return len(text)
+
+
+def skip_definition(kind: str, text: str, pos: int) -> int:
+    """Skip over a macro definition, failing if it uses any tracked commands"""
+    start = pos
+    if kind in ("def", "gdef", "edef", "xdef"):
+        pos = read_token(text, pos)
+        body = text.find("{", pos)
+        if body < 0:
+            raise ValueError(f"Could not parse definition: '{text[start:start + 40]}'")
+        pos = read_group(text, body)[1]
+    elif kind == "let":
+        pos = read_token(text, pos)
+        while pos < len(text) and text[pos] in " =":
+            pos += 1
+        pos = read_token(text, pos)
+    else:
+        pos = read_token(text, skip_star_and_options(text, pos))
+        pos = skip_star_and_options(text, pos)
+        # Environments have a "begin" and an "end" body, and xparse commands
+        # have an argument specification followed by the body
+        groups = 1 if kind.endswith("command") else 2
+        for _ in range(groups):
+            pos = read_group(text, pos)[1]
+    if TRACKED_USE.search(text, start, pos):
+        raise ValueError(f"Could not resolve definition: '{text[start:pos]}'")
+    return pos
+
+
+def scan_dependencies(document: Path) -> str:
+    """Scan a TeX document and return its dependencies as an XML log"""
+    return Scanner(Path(document)).to_xml()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    output, document = sys.argv[1:] if argv is None else argv
+    try:
+        xml = scan_dependencies(Path(document))
+    except (OSError, ValueError) as e:
+        print(f"Falling back to tectonic to list dependencies: {e}", file=sys.stderr)
+        return 1
+    Path(output).write_text(xml)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,32 +1,49 @@
 import gzip
 from pathlib import Path
+from typing import Dict, List, Optional
 
 from showyourwork2.paths import PathLike
 
+# The number of lines to buffer before writing compressed output
+BATCH_SIZE = 10_000
+
 
 def fix_synctex_paths(build_dir: PathLike, source: PathLike, target: PathLike) -> None:
-    # Read the generated SyncTeX
-    with gzip.open(source, "rb") as f:
-        data = f.read()
+    """Rewrite the input paths in a SyncTeX file to point to the user's files
 
-    # Rewrite the input paths to be relative to the user's tex directory if
-    # that file exists
-    with gzip.open(target, "wb") as f:
-        for line in data.split(b"\n"):
-            result = line
-            if line.decode().startswith("Input:"):
-                parts = line.decode().split(":")
+    The file is streamed from the source to the target, so the uncompressed
+    contents are never held in memory. Only the ``Input:`` records are decoded,
+    and all other lines are copied through as raw bytes.
+    """
+    resolved: Dict[str, Optional[str]] = {}
+    batch: List[bytes] = []
+    with gzip.open(source, "rb") as src, gzip.open(target, "wb", compresslevel=6) as f:
+        for raw in src:
+            line = raw if raw.endswith(b"\n") else raw + b"\n"
+            if line.startswith(b"Input:"):
+                parts = line.decode().rstrip("\r\n").split(":")
                 path = parts[-1].strip()
-                if len(path):
-                    path_ = Path(path)
-                    try:
-                        path_ = path_.relative_to(build_dir)
-                    except ValueError:
-                        pass
-                    else:
-                        if path_.exists():
-                            result = ":".join(
-                                parts[:-1] + [str(path_.resolve())]
-                            ).encode()
-            result += b"\n"
-            f.write(result)
+                if path not in resolved:
+                    resolved[path] = _resolve_input(build_dir, path)
+                new_path = resolved[path]
+                if new_path is not None:
+                    line = (":".join(parts[:-1] + [new_path]) + "\n").encode()
+            batch.append(line)
+            if len(batch) >= BATCH_SIZE:
+                f.write(b"".join(batch))
+                batch = []
+        f.write(b"".join(batch))
+
+
+def _resolve_input(build_dir: PathLike, path: str) -> Optional[str]:
+    # Rewrite the input path to be relative to the user's tex directory if that
+    # file exists
+    if not len(path):
+        return None
+    try:
+        path_ = Path(path).relative_to(build_dir)
+    except ValueError:
+        return None
+    if not path_.exists():
+        return None
+    return str(path_.resolve())
@@ -1,48 +1,51 @@
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple, Union
 
 import yaml
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, meta
+from pydantic import BaseModel
 
 from showyourwork2.paths import PathLike
 from showyourwork2.plugins.tex.models import ThemeModel, _theme_path_from_name
+from showyourwork2.utils import copy_file_or_directory, json_dump
 
 
 class Theme:
-    def __init__(self, model: ThemeModel):
+    """A TeX theme and the themes that it extends
+
+    The theme hierarchy, the merged config, the lists of resources, and the
+    Jinja environments are shared by all the ``Theme`` objects in a process
+    that point to the same theme directory, so constructing a theme for every
+    document is cheap. If ``cache_dir`` is provided, the compiled templates are
+    also cached on disk in that directory, to be reused by later processes.
+    """
+
+    def __init__(self, model: ThemeModel, cache_dir: Optional[PathLike] = None):
         self.path = model.path
         self.options = model.options
-        self._hierarchy: List[Path] = []
-        self.config: Dict[str, Any] = {}
-        _walk_theme_hierarchy(self.path, self._hierarchy, self.config)
+        self.cache_dir = None if cache_dir is None else str(cache_dir)
+        hierarchy, config = _load_theme_hierarchy(self.path)
+        self._hierarchy: List[Path] = list(hierarchy)
+        self.config: Dict[str, Any] = dict(config)
 
     def resources_for_template(self, template_slug: str) -> Dict[Path, Path]:
-        resources: Dict[Path, Path] = {}
-        for theme in self._hierarchy:
-            resource_directory = theme / "resources" / template_slug
-            if resource_directory.exists():
-                for resource in sorted(resource_directory.rglob("*")):
-                    key = resource.relative_to(resource_directory)
-                    if key not in resources:
-                        resources[key] = resource
-        return resources
+        return dict(_find_resources(tuple(self._hierarchy), template_slug))
+
+    def uses(self, template_name: str, variable: str) -> bool:
+        """Check if a template, or any template that it references, might use a
+        context variable
+        """
+        variables = _template_usage(tuple(self._hierarchy), template_name)
+        return variables is None or variable in variables
 
     def render(
         self,
         template_name: str,
-        config: Dict[str, Any],
+        config: Union[Dict[str, Any], BaseModel],
         dependencies: Optional[Dict[str, Any]] = None,
     ) -> str:
-        env = Environment(
-            block_start_string="((*",
-            block_end_string="*))",
-            variable_start_string="((-",
-            variable_end_string="-))",
-            comment_start_string="((=",
-            comment_end_string="=))",
-            autoescape=False,
-            loader=FileSystemLoader(self._hierarchy),
-        )
+        env = _get_environment(tuple(self._hierarchy), self.cache_dir)
         return env.get_template(template_name).render(
             config=config, dependencies=dependencies
         )
@@ -51,7 +54,7 @@ class Theme:
         self,
         template_name: str,
         target_file: PathLike,
-        config: Dict[str, Any],
+        config: Union[Dict[str, Any], BaseModel],
         dependencies: Optional[Dict[str, Any]] = None,
     ) -> None:
         txt = self.render(template_name, config, dependencies=dependencies)
@@ -59,6 +62,103 @@ class Theme:
             f.write(txt)
 
 
+def stage_resources(
+    resources: Dict[Path, Path], target_directory: PathLike, manifest: PathLike
+) -> None:
+    """Materialize a set of theme resources in a directory
+
+    ``resources`` maps each path relative to the target directory to its
+    source file, like the output of :meth:`Theme.resources_for_template`.
+    The files are hardlinked when possible, falling back to a copy (e.g. across
+    filesystems). A JSON manifest listing the staged files is written last, so
+    it can be used as the single output of a workflow rule.
+    """
+    target_directory = Path(target_directory)
+    staged = {}
+    for name, source in sorted(resources.items()):
+        target = target_directory / name
+        staged[str(name)] = str(source)
+        if Path(source).is_dir():
+            target.mkdir(parents=True, exist_ok=True)
+            continue
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if target.exists() and target.samefile(source):
+            continue
+        copy_file_or_directory(source, target, strategy="hardlink")
+    with open(manifest, "w") as f:
+        json_dump(staged, f)
+
+
+@lru_cache
+def _load_theme_hierarchy(theme: Path) -> Tuple[Tuple[Path, ...], Dict[str, Any]]:
+    # The returned config is shared, so callers must copy it before modifying
+    themes: List[Path] = []
+    config: Dict[str, Any] = {}
+    _walk_theme_hierarchy(theme, themes, config)
+    return tuple(themes), config
+
+
+@lru_cache
+def _find_resources(
+    hierarchy: Tuple[Path, ...], template_slug: str
+) -> Dict[Path, Path]:
+    resources: Dict[Path, Path] = {}
+    for theme in hierarchy:
+        resource_directory = theme / "resources" / template_slug
+        if resource_directory.exists():
+            for resource in sorted(resource_directory.rglob("*")):
+                key = resource.relative_to(resource_directory)
+                if key not in resources:
+                    resources[key] = resource
+    return resources
+
+
+@lru_cache
+def _get_environment(
+    hierarchy: Tuple[Path, ...], cache_dir: Optional[str] = None
+) -> Environment:
+    # Jinja keeps its own cache of loaded templates, and checks whether the
+    # source files have changed before reusing them
+    bytecode_cache = None if cache_dir is None else FileSystemBytecodeCache(cache_dir)
+    return Environment(
+        block_start_string="((*",
+        block_end_string="*))",
+        variable_start_string="((-",
+        variable_end_string="-))",
+        comment_start_string="((=",
+        comment_end_string="=))",
+        autoescape=False,
+        loader=FileSystemLoader(list(hierarchy)),
+        bytecode_cache=bytecode_cache,
+    )
+
+
+@lru_cache
+def _template_usage(
+    hierarchy: Tuple[Path, ...], template_name: str
+) -> Optional[FrozenSet[str]]:
+    # Find the context variables used by a template and all the templates that
+    # it extends, includes, or imports, or None if they can't be determined
+    # statically
+    env = _get_environment(hierarchy)
+    assert env.loader is not None
+    variables: Set[str] = set()
+    todo = [template_name]
+    done: Set[str] = set()
+    while todo:
+        name = todo.pop()
+        if name in done:
+            continue
+        done.add(name)
+        ast = env.parse(env.loader.get_source(env, name)[0])
+        variables |= meta.find_undeclared_variables(ast)
+        for ref in meta.find_referenced_templates(ast):
+            if ref is None:
+                return None
+            todo.append(ref)
+    return frozenset(variables)
+
+
 def _load_theme_config(theme: Path) -> Dict[str, Any]:
     config_file = theme / "theme.yml"
     if config_file.is_file():
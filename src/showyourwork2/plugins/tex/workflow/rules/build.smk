@@ -13,13 +13,31 @@ for document in SYW__DOCUMENTS:
     build_dir = SYW__WORK_PATHS.build / doc
     pdf = build_dir / Path(doc).with_suffix(".pdf")
     synctex = build_dir / Path(doc).with_suffix(".synctex.gz")
+    compile_name = sywplug_tex__rule_name("build", "compile", document=doc)
+
+    # Snakemake reruns this rule whenever one of the document's dependencies
+    # is regenerated, so skip compiling if all of them are unchanged. The theme
+    # resources are staged next to the document without being declared as
+    # outputs, so they're fingerprinted along with the conda environment.
+    tectonic_env = sywplug_tex__resource("envs", "tectonic.yml")
+    skip_unchanged = ""
+    if SYW__FINGERPRINTS is not None:
+        theme = Theme(document.theme, cache_dir=sywplug_tex__template_cache)
+        staged_resources = [
+            build_dir / doc_dir / name
+            for name, source in sorted(theme.resources_for_template("build").items())
+            if not source.is_dir()
+        ]
+        skip_unchanged = SYW__FINGERPRINTS.skip_unchanged(
+            compile_name, [*staged_resources, tectonic_env]
+        )
 
     rule:
         """
         Compile the document using ``tectonic``.
         """
         name:
-            sywplug_tex__rule_name("build", "compile", document=doc)
+            compile_name
         message:
             f"Compiling document '{Path(doc).name}'"
         input:
@@ -31,9 +49,9 @@ for document in SYW__DOCUMENTS:
             pdf,
             synctex if enable_synctex else [],
         conda:
-            sywplug_tex__resource("envs", "tectonic.yml")
+            tectonic_env
         shell:
-            "tectonic "
+            skip_unchanged + "tectonic "
             "--chatter minimal "
             "--synctex "
             "--keep-logs "
@@ -51,8 +69,10 @@ for document in SYW__DOCUMENTS:
             pdf
         output:
             Path(doc).with_suffix(".pdf")
+        params:
+            strategy=config.materialize,
         run:
-            utils.copy_file_or_directory(input[0], output[0])
+            utils.copy_file_or_directory(input[0], output[0], strategy=params.strategy)
 
     if enable_synctex:
         rule:
@@ -1,3 +1,4 @@
+from showyourwork2.objects import ObjectStore
 from showyourwork2.plugins.tex.theme import Theme
 from showyourwork2.paths import path_to_rule_name
 
@@ -7,6 +8,8 @@ sywplug_tex__rule_name = partial(
 sywplug_tex__resource = partial(
     package_data, "showyourwork2.plugins.tex", "workflow"
 )
+sywplug_tex__template_cache = SYW__WORK_PATHS.plugin("tex", "templates")
+sywplug_tex__objects = ObjectStore(SYW__WORK_PATHS.objects)
 
 def sywplug_tex__local_or_provided_style(document):
     """Get the path to the showyourwork.sty file. We prefer to use the one
@@ -28,12 +31,14 @@ for base_path in [SYW__WORK_PATHS / "dependencies", SYW__WORK_PATHS / "build"]:
         work_dir = base_path / doc
 
         # Work out the theme resources
-        theme = Theme(document.theme)
+        theme = Theme(document.theme, cache_dir=sywplug_tex__template_cache)
         theme_resources = theme.resources_for_template(slug)
 
         rule:
             """
-            Copy explicit dependencies to the working directory.
+            Copy explicit dependencies to the working directory. Since these
+            are often shared between documents, they are linked from the
+            object store by default.
             """
             name:
                 sywplug_tex__rule_name("copy", "dependencies", "to", slug, document=doc)
@@ -41,22 +46,40 @@ for base_path in [SYW__WORK_PATHS / "dependencies", SYW__WORK_PATHS / "build"]:
                 "{file}"
             output:
                 work_dir / "{file}"
+            params:
+                object_store=config.object_store,
+                strategy=config.materialize,
             run:
-                utils.copy_file_or_directory(input[0], output[0])
+                if params.object_store:
+                    sywplug_tex__objects.link(input[0], output[0])
+                else:
+                    utils.copy_file_or_directory(input[0], output[0], strategy=params.strategy)
 
-        for resource_out, resource_in in theme_resources.items():
+        resource_manifest = work_dir / doc_dir / "showyourwork.resources.json"
+        if theme_resources:
             rule:
                 """
-                Copy theme resources to the working directory.
+                Copy the theme resources to the working directory, using
+                hardlinks where possible.
                 """
                 name:
-                    sywplug_tex__rule_name("copy", "resources", "for", slug, path_to_rule_name(resource_in), document=doc)
+                    sywplug_tex__rule_name("copy", "resources", slug, document=doc)
                 input:
-                    resource_in
+                    list(theme_resources.values())
                 output:
-                    work_dir / doc_dir / resource_out
+                    resource_manifest
+                params:
+                    resources=theme_resources,
+                    target_directory=work_dir / doc_dir,
                 run:
-                    utils.copy_file_or_directory(input[0], output[0])
+                    from showyourwork2.plugins.tex.theme import stage_resources
+
+                    stage_resources(params.resources, params.target_directory, output[0])
+
+        # The style file only needs to be re-rendered when the dependencies
+        # change if the template actually uses them
+        template_name = f"{slug}.tex"
+        use_dependencies = slug == "build" and theme.uses(template_name, "dependencies")
 
         rule:
             """
@@ -66,12 +89,12 @@ for base_path in [SYW__WORK_PATHS / "dependencies", SYW__WORK_PATHS / "build"]:
             name:
                 sywplug_tex__rule_name("style", slug, document=doc)
             input:
-                [work_dir / doc_dir / f for f in theme_resources.keys()],
-                dependencies_file=SYW__WORK_PATHS.dependencies_for(doc) if slug == "build" else [],
+                resource_manifest if theme_resources else [],
+                dependencies_file=SYW__WORK_PATHS.dependencies_for(doc) if use_dependencies else [],
             output:
                 work_dir / doc_dir / "showyourwork.tex"
             params:
-                slug=slug,
+                template_name=template_name,
                 config=config,
                 theme=theme,
             run:
@@ -83,7 +106,7 @@ for base_path in [SYW__WORK_PATHS / "dependencies", SYW__WORK_PATHS / "build"]:
                     dependencies = None
 
                 params.theme.render_to(
-                    template_name=f"{params.slug}.tex",
+                    template_name=params.template_name,
                     target_file=output[0],
                     config=params.config,
                     dependencies=dependencies,
@@ -103,8 +126,10 @@ for base_path in [SYW__WORK_PATHS / "dependencies", SYW__WORK_PATHS / "build"]:
                 sywplug_tex__local_or_provided_style(doc)
             output:
                 work_dir / doc_dir / "showyourwork.sty"
+            params:
+                strategy=config.materialize,
             run:
-                utils.copy_file_or_directory(input[0], output[0])
+                utils.copy_file_or_directory(input[0], output[0], strategy=params.strategy)
 
         rule:
             """
@@ -117,5 +142,7 @@ for base_path in [SYW__WORK_PATHS / "dependencies", SYW__WORK_PATHS / "build"]:
                 SYW__WORK_PATHS.root / doc
             output:
                 work_dir / doc
+            params:
+                strategy=config.materialize,
             run:
-                utils.copy_file_or_directory(input[0], output[0])
+                utils.copy_file_or_directory(input[0], output[0], strategy=params.strategy)
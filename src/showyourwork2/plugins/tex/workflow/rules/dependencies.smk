@@ -6,10 +6,25 @@ log file instead of including the file. After running this hacked TeX file
 through ``tectonic``, the log file is parsed to extract the dependency
 structure. Of note, this procedure depends on the TeX documents including the
 ``showyourwork`` package, and the workflow will fail if it is not included.
+
+The XML log files are cached based on the contents of all the files that
+tectonic reads (and the tectonic environment), so that this extra LaTeX run is
+skipped when a document is touched, checked out, or reverted without any
+changes to its contents. If a document sets ``dependency_scanner: python``, the
+TeX source is first scanned directly in Python (see
+``showyourwork2.plugins.tex.scanner``), and tectonic is only used as a fallback.
 """
 
+import shlex
+import sys
+
 from showyourwork2.plugins.tex.dependencies import parse_dependencies
 
+# The interpreter is part of the commands rather than a rule parameter, since
+# Snakemake reruns jobs when their parameters change, and it would differ when
+# showyourwork is run from another environment
+sywplug_tex__python = shlex.quote(sys.executable).replace("{", "{{").replace("}", "}}")
+
 # We only define these rules for documents explicitly listed in the config file
 # because we otherwise end up with ambigious rules for other TeX files. So here
 # we're looping over all the document paths.
@@ -19,6 +34,10 @@ for document in SYW__DOCUMENTS:
     doc_dir = Path(doc).parent
     deps_dir = SYW__WORK_PATHS / "dependencies" / doc
     xml =  deps_dir / doc_dir / f"{Path(doc).with_suffix('').name}.dependencies.xml"
+    scan = (
+        f"{sywplug_tex__python} {{params.scanner:q}} {{output:q}} {{input.document:q}} || "
+        if document.dependency_scanner == "python" else ""
+    )
 
     rule:
         """
@@ -35,14 +54,22 @@ for document in SYW__DOCUMENTS:
             classfile=deps_dir / doc_dir / "showyourwork.sty",
         output:
             xml
+        params:
+            env=sywplug_tex__resource("envs", "tectonic.yml"),
+            scanner=package_data("showyourwork2.plugins.tex", "scanner.py"),
         conda:
             sywplug_tex__resource("envs", "tectonic.yml")
         shell:
+            scan +
+            f"{sywplug_tex__python} -m showyourwork2.cache restore tex_dependencies "
+            "{output:q} {params.env:q} {input:q} || ( "
             "tectonic "
             "--chatter minimal "
             "--keep-logs "
             "--keep-intermediates "
-            "{input.document:q} "
+            "{input.document:q} && "
+            f"{sywplug_tex__python} -m showyourwork2.cache store tex_dependencies "
+            "{output:q} {params.env:q} {input:q} )"
 
     rule:
         """
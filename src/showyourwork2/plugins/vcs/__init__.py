@@ -1,9 +1,9 @@
 from pathlib import Path
-from typing import Type
+from typing import Any, Type
 
 from showyourwork2.paths import package_data
 from showyourwork2.plugins.hooks import hookimpl
-from showyourwork2.plugins.vcs.models import Document
+from showyourwork2.plugins.vcs.models import Document, git_index_state
 
 
 @hookimpl
@@ -14,3 +14,8 @@ def snakefile() -> Path:
 @hookimpl
 def document_model() -> Type[Document]:
     return Document
+
+
+@hookimpl
+def config_cache_key() -> Any:
+    return git_index_state()
@@ -1,7 +1,7 @@
 from pathlib import Path
-from typing import TYPE_CHECKING, List
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
-from pydantic import BaseModel, model_validator  # type: ignore
+from pydantic import BaseModel, ValidationInfo, model_validator  # type: ignore
 
 from showyourwork2 import git
 from showyourwork2.paths import PathLike
@@ -13,7 +13,12 @@ class Document(BaseModel):
         dependencies: List[Path] = []
 
     @model_validator(mode="after")
-    def include_git_dependencies(self) -> "Document":
+    def include_git_dependencies(self, info: ValidationInfo) -> "Document":
+        # If this model is being loaded from the config cache, the git
+        # dependencies have already been included
+        context: Optional[Dict[str, Any]] = info.context
+        if context is not None and context.get("cached", False):
+            return self
         git_files = git_list_files()
         for dep in filter_files_below(git_files, self.path):
             dep_ = Path(dep)
@@ -36,3 +41,33 @@ def git_list_files() -> List[str]:
             "Could not list files tracked by git; "
             "are you sure you're in a git repository?"
         ) from e
+
+
+def git_index_state() -> Any:
+    """The state of the git index and HEAD, which determine the list of files
+    returned by ``git.list_files``
+    """
+    git_dir = Path(".git")
+    if not git_dir.is_dir():
+        r = git.git(["rev-parse", "--git-dir"], check=False)
+        if r.returncode:
+            return None
+        git_dir = Path(r.stdout.strip())
+
+    state: List[Any] = [str(git_dir.resolve())]
+    try:
+        head = (git_dir / "HEAD").read_text().strip()
+    except OSError:
+        return None
+    state.append(head)
+    files = [git_dir / "index"]
+    if head.startswith("ref:"):
+        files.append(git_dir / head[4:].strip())
+    for file in files:
+        try:
+            stat = file.stat()
+        except OSError:
+            state.append(None)
+        else:
+            state.append([stat.st_mtime_ns, stat.st_size])
+    return state
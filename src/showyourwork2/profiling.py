@@ -0,0 +1,168 @@
+import csv
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional
+
+import snakemake
+
+from showyourwork2 import paths
+from showyourwork2.config.models import Config
+
+if TYPE_CHECKING:
+    import snakemake.workflow
+
+Job = Dict[str, Any]
+
+
+def profile_file(config: Config) -> Path:
+    return paths.work(config.working_directory).logs / "profile.json"
+
+
+def enable_profiling(workflow: "snakemake.workflow.Workflow", config: Config) -> None:
+    """Record timing, exit status and peak memory usage for every job
+
+    Snakemake's benchmark files are used to measure the peak RSS of each job, so
+    we add a benchmark file to every rule that doesn't already define one. The
+    start and end times and the status of each job are collected by a log
+    handler and saved to ``profile.json`` in the logs directory.
+    """
+    logs = paths.work(config.working_directory).logs
+    for rule in workflow.rules:
+        if rule.benchmark is not None or not rule.output:
+            continue
+        wildcards = "/".join(f"{{{w}}}" for w in sorted(rule.wildcard_names))
+        rule.benchmark_modifier = workflow.modifier.path_modifier
+        rule.benchmark = logs / "benchmarks" / rule.name / f"{wildcards or 'job'}.tsv"
+
+    snakemake_logger = snakemake.logging.logger
+    if snakemake_logger.dryrun:
+        return
+
+    filename = profile_file(config)
+    jobs: Dict[int, Job] = {}
+
+    def handler(msg: Dict[str, Any]) -> None:
+        level = msg["level"]
+        if level == "job_info":
+            jobs[msg["jobid"]] = {
+                "rule": msg["name"],
+                "input": list(map(str, msg.get("input", []))),
+                "output": list(map(str, msg.get("output", []))),
+                "benchmark": None
+                if msg["benchmark"] is None
+                else str(msg["benchmark"]),
+                "start": msg["timestamp"],
+                "end": None,
+                "status": "running",
+                "max_rss": None,
+            }
+            return
+        elif level == "job_finished":
+            status = "ok"
+        elif level == "job_error":
+            status = "error"
+        else:
+            return
+
+        job = jobs.get(msg.get("jobid", None))
+        if job is None:
+            return
+        job["end"] = msg["timestamp"]
+        job["status"] = status
+        job["max_rss"] = read_max_rss(job["benchmark"])
+        with open(filename, "w") as f:
+            json.dump(list(jobs.values()), f, indent=2)
+
+    snakemake_logger.log_handler.append(handler)
+
+
+def read_max_rss(benchmark: Optional[paths.PathLike]) -> Optional[float]:
+    """Read the peak RSS (in MB) from a snakemake benchmark file"""
+    if benchmark is None:
+        return None
+    try:
+        with open(benchmark, "r") as f:
+            rows = list(csv.DictReader(f, delimiter="\t"))
+    except OSError:
+        return None
+    values = []
+    for row in rows:
+        try:
+            values.append(float(row.get("max_rss", "NA")))
+        except ValueError:
+            continue
+    return max(values) if values else None
+
+
+def load_profile(filename: paths.PathLike) -> List[Job]:
+    with open(filename, "r") as f:
+        return json.load(f)
+
+
+def duration(job: Job) -> float:
+    if job["end"] is None:
+        return 0.0
+    return float(job["end"] - job["start"])
+
+
+def critical_path(jobs: List[Job], target: paths.PathLike) -> List[Job]:
+    """Find the chain of jobs with the longest total duration leading to a
+    target file
+
+    The jobs are listed in execution order, and only jobs that were executed in
+    the profiled build are considered. An empty list is returned if the target
+    wasn't produced by any of the jobs.
+    """
+    producers = {output: job for job in jobs for output in job["output"]}
+    cache: Dict[int, List[Job]] = {}
+
+    def longest(job: Job) -> List[Job]:
+        if id(job) in cache:
+            return cache[id(job)]
+        # Prevent infinite recursion in the (unexpected) case of a cycle
+        cache[id(job)] = [job]
+        best: List[Job] = []
+        best_time = 0.0
+        for file in job["input"]:
+            parent = producers.get(file)
+            if parent is None or parent is job:
+                continue
+            path = longest(parent)
+            path_time = sum(map(duration, path))
+            if path_time > best_time:
+                best, best_time = path, path_time
+        cache[id(job)] = best + [job]
+        return cache[id(job)]
+
+    job = producers.get(str(target))
+    if job is None:
+        return []
+    return longest(job)
+
+
+def summarize(jobs: List[Job], targets: Iterable[paths.PathLike]) -> str:
+    lines = []
+    total = sum(map(duration, jobs))
+    lines.append(f"Executed {len(jobs)} jobs with a total run time of {total:.2f}s")
+
+    by_rule: Dict[str, float] = {}
+    for job in jobs:
+        by_rule[job["rule"]] = by_rule.get(job["rule"], 0.0) + duration(job)
+    lines.append("")
+    lines.append("Slowest rules:")
+    for rule, t in sorted(by_rule.items(), key=lambda x: -x[1])[:10]:
+        lines.append(f"  {t:8.2f}s  {rule}")
+
+    for target in targets:
+        path = critical_path(jobs, target)
+        if not path:
+            continue
+        lines.append("")
+        lines.append(
+            f"Critical path to '{target}' "
+            f"({sum(map(duration, path)):.2f}s over {len(path)} jobs):"
+        )
+        for job in path:
+            rss = "" if job["max_rss"] is None else f" ({job['max_rss']:.0f} MB)"
+            lines.append(f"  {duration(job):8.2f}s  {job['rule']}{rss}")
+    return "\n".join(lines)
@@ -30,6 +30,20 @@ def cwd(path: PathLike) -> Generator[None, None, None]:
         os.chdir(old_dir)
 
 
+@contextmanager
+def user_cache_dir(path: PathLike) -> Generator[None, None, None]:
+    """Use a different directory instead of the user's cache directory"""
+    old_dir = os.environ.get("SHOWYOURWORK_CACHE_DIR")
+    os.environ["SHOWYOURWORK_CACHE_DIR"] = str(path)
+    try:
+        yield
+    finally:
+        if old_dir is None:
+            del os.environ["SHOWYOURWORK_CACHE_DIR"]
+        else:
+            os.environ["SHOWYOURWORK_CACHE_DIR"] = old_dir
+
+
 class TemporaryDirectory:
     def __init__(
         self, path: PathLike, args: Iterable[str] = (), force_explicit: bool = False
@@ -97,7 +111,12 @@ class run:
         **kwargs: Any,
     ):
         self._directory = TemporaryDirectory(path, args)
-        self._finalizer = weakref.finalize(self, self._cleanup, self._directory)
+        # Each run gets an empty cache, so that it doesn't use, or modify, the
+        # cache of the user running the tests
+        self._cache_directory = TemporaryDirectory(path, ("cache",) + args)
+        self._finalizer = weakref.finalize(
+            self, self._cleanup, self._directory, self._cache_directory
+        )
 
         tmpdir = self._directory.name
         test_project_root = Path(path).resolve()
@@ -116,7 +135,7 @@ class run:
                 test_project_root, tmpdir, ignore=ignore_expected, dirs_exist_ok=True
             )
 
-        with cwd(tmpdir):
+        with cwd(tmpdir), user_cache_dir(self._cache_directory.name):
             if git_init:
                 git(["init", "."])
                 git(["add", "."])
@@ -206,12 +225,13 @@ class run:
         self.cleanup()
 
     @classmethod
-    def _cleanup(cls, directory: TemporaryDirectory) -> None:
-        directory.cleanup()
+    def _cleanup(cls, *directories: TemporaryDirectory) -> None:
+        for directory in directories:
+            directory.cleanup()
 
     def cleanup(self) -> None:
         if self._finalizer.detach():
-            self._cleanup(self._directory)
+            self._cleanup(self._directory, self._cache_directory)
 
 
 class run_snakemake(run):
@@ -273,6 +293,7 @@ class run_showyourwork(run):
         cores: str = "1",
         conda_frontend: Optional[str] = "mamba",
         conda_prefix: Optional[str] = CONDA_PREFIX,
+        in_process: bool = False,
     ):
         self.conda_prefix = conda_prefix
         super().__init__(
@@ -288,6 +309,7 @@ class run_showyourwork(run):
             configfile=configfile,
             cores=cores,
             conda_frontend=conda_frontend,
+            in_process=in_process,
         )
 
     def execute(self, *args: Any, **kwargs: Any) -> None:
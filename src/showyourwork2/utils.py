@@ -1,17 +1,92 @@
 import json
+import os
 import shutil
+from functools import partial
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Literal, Optional
 
 from showyourwork2.paths import PathLike, path_to_rule_name
 
+MaterializeStrategy = Literal["copy", "reflink", "hardlink", "symlink"]
 
-def copy_file_or_directory(src: PathLike, dst: PathLike) -> None:
+# The ioctl request code for cloning a file on Linux (FICLONE in linux/fs.h)
+FICLONE = 0x40049409
+
+
+def copy_file_or_directory(
+    src: PathLike, dst: PathLike, strategy: MaterializeStrategy = "copy"
+) -> None:
+    """Materialize a file or directory at a new path
+
+    The ``strategy`` sets how the data is shared with the source:
+
+    - ``"copy"``: an independent copy, made within the kernel when possible
+      (which can be a server-side copy or a clone on some filesystems),
+    - ``"reflink"``: a copy-on-write clone of the source,
+    - ``"hardlink"``: a hard link to the source,
+    - ``"symlink"``: a symbolic link to the absolute source path.
+
+    Directories are recreated, and each of the files within them are
+    materialized individually. If the requested strategy isn't supported (e.g.
+    linking across filesystems), this falls back to making a copy.
+    """
     Path(dst).parent.mkdir(parents=True, exist_ok=True)
     if Path(src).is_dir():
-        shutil.copytree(src, dst)
+        shutil.copytree(
+            src, dst, copy_function=partial(_materialize, strategy=strategy)
+        )
     else:
-        shutil.copyfile(src, dst)
+        _materialize(src, dst, strategy=strategy)
+
+
+def _materialize(src: PathLike, dst: PathLike, strategy: MaterializeStrategy) -> None:
+    # Remove any existing file first, so that we never write through a link
+    # into the source of a previous run
+    if os.path.lexists(dst):
+        real_dst = os.path.join(
+            os.path.realpath(os.path.dirname(os.path.abspath(dst))),
+            os.path.basename(dst),
+        )
+        if real_dst == os.path.realpath(src):
+            raise shutil.SameFileError(f"{src!r} and {dst!r} are the same file")
+        os.unlink(dst)
+    try:
+        if strategy == "hardlink":
+            os.link(src, dst)
+            return
+        if strategy == "symlink":
+            os.symlink(os.path.abspath(src), dst)
+            return
+        if strategy == "reflink":
+            _reflink(src, dst)
+            return
+    except OSError:
+        pass
+    _copy_file(src, dst)
+
+
+def _reflink(src: PathLike, dst: PathLike) -> None:
+    try:
+        import fcntl
+    except ImportError as e:
+        raise OSError("Reflinks are not supported on this platform") from e
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+
+
+def _copy_file(src: PathLike, dst: PathLike) -> None:
+    # "copy_file_range" lets the kernel (or a network filesystem server) copy
+    # the data without passing through user space. Otherwise, "shutil" already
+    # uses "sendfile" where it is available.
+    if hasattr(os, "copy_file_range"):
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                while os.copy_file_range(fsrc.fileno(), fdst.fileno(), 1 << 30):
+                    pass
+            return
+        except OSError:
+            pass
+    shutil.copyfile(src, dst)
 
 
 def rule_name(
@@ -0,0 +1,186 @@
+import json
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from showyourwork2 import paths
+from showyourwork2.config import load_config
+from showyourwork2.config.models import Config
+from showyourwork2.dependencies import DependencyGraph
+from showyourwork2.logging import get_logger
+
+FileState = Optional[Tuple[int, int]]
+
+
+def file_state(path: Path) -> FileState:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def expand_paths(project_root: Path, files: Iterable[paths.PathLike]) -> Set[Path]:
+    """Convert paths relative to the project root into a set of files, expanding
+    any directories into the files that they contain
+    """
+    result = set()
+    for file in files:
+        path = project_root / file
+        if path.is_dir():
+            result |= {f for f in path.rglob("*") if not f.is_dir()}
+        else:
+            result.add(path)
+    return result
+
+
+class Watcher:
+    """Watch the inputs of a project and rebuild the affected artifacts
+
+    The validated config and the simplified dependency tree are kept in memory
+    between builds; the config is only re-parsed when the config file itself
+    changes, and the dependency tree is re-loaded after each build.
+
+    Args:
+        config_file: The path to the showyourwork configuration file.
+        project_root: The root directory of the project.
+        build: A function that executes the workflow for a list of targets
+            (relative to the project root) and returns an exit code.
+        interval: The polling interval in seconds.
+        debounce: Changes are only acted upon once no further changes have
+            been detected for this many seconds, so that bursts of saves are
+            coalesced into a single rebuild.
+    """
+
+    def __init__(
+        self,
+        config_file: paths.PathLike,
+        project_root: paths.PathLike,
+        build: Callable[[List[str]], int],
+        interval: float = 0.5,
+        debounce: float = 0.5,
+    ):
+        self.config_file = Path(config_file).resolve()
+        self.project_root = Path(project_root).resolve()
+        self.build = build
+        self.interval = interval
+        self.debounce = debounce
+        self.config = self.load_config()
+        self.tree = self.load_dependency_tree()
+        self.logger = get_logger(self.config)
+        self.state: Dict[Path, FileState] = {}
+
+    def load_config(self) -> Config:
+        return load_config(self.config_file)
+
+    @property
+    def dependency_tree_file(self) -> Path:
+        work = paths.work(self.config.working_directory)
+        return self.project_root / work.root / "dependency_tree_simple.json"
+
+    def load_dependency_tree(self) -> Dict[str, List[str]]:
+        try:
+            with open(self.dependency_tree_file, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def watched_files(self) -> Set[Path]:
+        files: List[paths.PathLike] = []
+        for deps in self.tree.values():
+            files.extend(deps)
+        for doc in self.config.documents:
+            files.append(doc.path)
+            files.extend(doc.dependencies)
+        files.extend(self.config.static)
+        for dynamic in self.config.dynamic:
+            files.append(dynamic.script)
+            files.extend(dynamic.input)
+        return expand_paths(self.project_root, files) | {self.config_file}
+
+    def poll(self) -> Set[Path]:
+        """Update the recorded file states and return the files that changed"""
+        state = {f: file_state(f) for f in self.watched_files()}
+        changed = {f for f, s in state.items() if self.state.get(f) != s}
+        changed |= set(self.state) - set(state)
+        self.state = state
+        return changed
+
+    def wait_for_changes(self) -> Set[Path]:
+        """Block until files change, then until they stop changing"""
+        changed: Set[Path] = set()
+        while not changed:
+            time.sleep(self.interval)
+            changed = self.poll()
+        quiet_since = time.monotonic()
+        while time.monotonic() - quiet_since < self.debounce:
+            time.sleep(min(self.interval, self.debounce))
+            new = self.poll()
+            if new:
+                changed |= new
+                quiet_since = time.monotonic()
+        return changed
+
+    def all_targets(self) -> List[str]:
+        artifacts = [str(a) for doc in self.config.documents for a in doc.artifacts]
+        tree_file = self.dependency_tree_file.relative_to(self.project_root)
+        return artifacts + [str(tree_file)]
+
+    def affected_targets(self, changed: Set[Path]) -> List[str]:
+        """The list of targets that need to be rebuilt given a set of changed
+        files
+
+        If the config file changed, it is re-parsed and all the artifacts are
+        rebuilt. Artifacts that aren't listed in the dependency tree are always
+        considered to be affected.
+        """
+        if self.config_file in changed:
+            self.config = self.load_config()
+            return self.all_targets()
+
+        affected = set()
+        for path in changed:
+            try:
+                affected.add(str(path.relative_to(self.project_root)))
+            except ValueError:
+                continue
+
+        # Generated files can be inputs to other rules (e.g. a figure that is
+        # included in a document), so we propagate the changes downstream.
+        affected |= DependencyGraph(self.tree).downstream(affected)
+
+        targets = []
+        for doc in self.config.documents:
+            doc_files = {str(doc.path)} | {str(d) for d in doc.dependencies}
+            for artifact in doc.artifacts:
+                name = str(artifact)
+                if name not in self.tree or name in affected or affected & doc_files:
+                    targets.append(name)
+        if not targets:
+            return []
+
+        # Always keep the dependency tree up to date so that new dependencies are
+        # picked up by subsequent rebuilds
+        tree_file = self.dependency_tree_file.relative_to(self.project_root)
+        return targets + [str(tree_file)]
+
+    def rebuild(self, targets: List[str]) -> int:
+        self.logger.info(f"Building: {', '.join(targets)}")
+        returncode = self.build(targets)
+        if returncode:
+            self.logger.error(f"Build failed with exit code {returncode}")
+        self.tree = self.load_dependency_tree()
+        self.poll()
+        return returncode
+
+    def run(self) -> None:
+        self.rebuild(self.all_targets())
+        self.logger.info(f"Watching {len(self.state)} files for changes")
+        try:
+            while True:
+                changed = self.wait_for_changes()
+                targets = self.affected_targets(changed)
+                if targets:
+                    self.rebuild(targets)
+        except KeyboardInterrupt:
+            self.logger.info("Stopped watching for changes")
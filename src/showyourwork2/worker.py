@@ -0,0 +1,354 @@
+"""
+Run Python scripts in pre-warmed interpreters.
+
+Importing large libraries like ``numpy`` or ``matplotlib`` can take longer than
+running a short figure script. This module keeps a server process for each
+Python interpreter (e.g. each conda environment) and set of preloaded modules,
+and runs each script in a fresh process forked from that server, so the
+imports are only paid once. Since every script runs in its own fork, scripts
+can't affect each other.
+
+The client passes its standard streams, working directory, and environment to
+the server, and exits with the same status as the script, so this is a
+drop-in replacement for running ``python SCRIPT ARGS...``::
+
+    python worker.py [--preload MODULE]... [--idle-timeout SECONDS] SCRIPT ARGS...
+
+Modules are preloaded using the environment of the client that started the
+server, so there is a separate server for each value of the variables that are
+usually read when modules are imported (e.g. ``OMP_NUM_THREADS``, which sets
+the size of the thread pools of numerical libraries, or ``MPLBACKEND``). Other
+variables only affect code that reads them while the script is running. If the
+server can't be used (e.g. on platforms without ``fork``, or before Python 3.9),
+the script is executed directly instead. The server exits after it has been idle
+for ``--idle-timeout`` seconds.
+
+This module only depends on the standard library, and it is executed by path,
+so that it can be used from any environment, even if ``showyourwork2`` isn't
+installed there.
+"""
+
+# Only the modules that are needed by the client are imported at the top level,
+# to keep the overhead of running each script as small as possible
+import hashlib
+import marshal
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Any, Dict, List, NoReturn, Optional, Tuple
+
+# How long to wait for a new server to start accepting connections
+STARTUP_TIMEOUT = 60.0
+IDLE_TIMEOUT = 600.0
+HEADER_SIZE = 8
+
+# Environment variables that are read when modules are imported, so they must
+# match between the server and each script
+IMPORT_ENVIRONMENT = (
+    "PYTHONPATH",
+    "PYTHONHASHSEED",
+    "PYTHONWARNINGS",
+    "MPLBACKEND",
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = sys.argv[1:] if argv is None else argv
+    preload: List[str] = []
+    idle_timeout = IDLE_TIMEOUT
+    while args and args[0].startswith("--"):
+        option, *args = args
+        if option == "--":
+            break
+        if option == "--preload":
+            preload.append(args.pop(0))
+        elif option == "--idle-timeout":
+            idle_timeout = float(args.pop(0))
+        elif option == "--serve":
+            return serve(args[0], preload, idle_timeout)
+        else:
+            raise ValueError(f"Unknown option: '{option}'")
+    if not args:
+        raise ValueError("No script was provided")
+    return run(args, preload, idle_timeout)
+
+
+def run(args: List[str], preload: List[str], idle_timeout: float) -> int:
+    """Run a script using a server, starting one if needed"""
+    conn = _connect_or_start(preload, idle_timeout)
+    if conn is None:
+        _exec_directly(args)
+    with conn:
+        request = marshal.dumps(
+            {"argv": args, "cwd": os.getcwd(), "env": dict(os.environ)}
+        )
+        header = len(request).to_bytes(HEADER_SIZE, "big")
+        socket.send_fds(conn, [header], [0, 1, 2])
+        conn.sendall(request)
+        data = _recv_all(conn)
+        result = marshal.loads(data) if data else {}
+    if "signal" in result:
+        # Die in the same way that the script did
+        signal.signal(result["signal"], signal.SIG_DFL)
+        os.kill(os.getpid(), result["signal"])
+    return result.get("returncode", 1)
+
+
+def serve(address: str, preload: List[str], idle_timeout: float) -> int:
+    """Preload modules and fork a process for each script that is requested
+
+    The server exits when it has been idle for ``idle_timeout`` seconds, or
+    when its socket has been replaced by another server.
+    """
+    import importlib
+
+    # Don't let the modules next to this file shadow any top-level modules
+    here = os.path.dirname(os.path.abspath(__file__))
+    sys.path[:] = [p for p in sys.path if os.path.abspath(p or ".") != here]
+    for module in preload:
+        try:
+            importlib.import_module(module)
+        except Exception:  # noqa: BLE001
+            pass
+
+    # Bind to a temporary path and then move it into place, so that clients
+    # never connect before the server is listening
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    tmp = f"{address}.{os.getpid()}"
+    server.bind(tmp)
+    server.listen()
+    os.replace(tmp, address)
+    inode = os.stat(address).st_ino
+    server.settimeout(1.0)
+
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    last_active = time.monotonic()
+    while time.monotonic() - last_active < idle_timeout:
+        try:
+            if os.stat(address).st_ino != inode:
+                break
+        except OSError:
+            break
+        try:
+            conn, _ = server.accept()
+        except socket.timeout:
+            continue
+        if os.fork() == 0:
+            server.close()
+            _supervise(conn)
+        conn.close()
+        last_active = time.monotonic()
+    server.close()
+    return 0
+
+
+def _supervise(conn: socket.socket) -> NoReturn:
+    # Run a single script in a new process, and report its exit status back to
+    # the client. If the client goes away, the script is terminated.
+    import select
+
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    request, fds = _recv_request(conn)
+    pid = os.fork()
+    if pid == 0:
+        conn.close()
+        _run_script(request, fds)
+    for fd in fds:
+        os.close(fd)
+
+    # Where possible, wait on a file descriptor for the process so that we're
+    # woken up as soon as it exits, instead of polling
+    waitables: List[Any] = [conn]
+    interval: Optional[float] = 0.01
+    if hasattr(os, "pidfd_open"):
+        try:
+            waitables.append(os.pidfd_open(pid))
+            interval = None
+        except OSError:
+            pass
+
+    status = None
+    while status is None:
+        done, wait_status = os.waitpid(pid, os.WNOHANG)
+        if done:
+            status = wait_status
+            break
+        readable, _, _ = select.select(waitables, [], [], interval)
+        if conn in readable and not conn.recv(1):
+            os.kill(pid, signal.SIGTERM)
+            status = os.waitpid(pid, 0)[1]
+
+    if os.WIFSIGNALED(status):
+        result = {"signal": os.WTERMSIG(status)}
+    else:
+        result = {"returncode": os.WEXITSTATUS(status)}
+    try:
+        conn.sendall(marshal.dumps(result))
+    except OSError:
+        pass
+    os._exit(0)
+
+
+def _run_script(request: Dict[str, Any], fds: List[int]) -> NoReturn:
+    # Set up the process to look like "python SCRIPT ARGS..." in the client's
+    # environment, and then run the script
+    import atexit
+    import runpy
+
+    for target, fd in enumerate(fds):
+        os.dup2(fd, target)
+        os.close(fd)
+    sys.stdin = open(0, closefd=False)  # noqa: SIM115
+    sys.stdout = open(1, "w", closefd=False)  # noqa: SIM115
+    sys.stderr = open(2, "w", closefd=False)  # noqa: SIM115
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    os.chdir(request["cwd"])
+    os.environ.clear()
+    os.environ.update(request["env"])
+    script = request["argv"][0]
+    sys.argv = list(request["argv"])
+    sys.path.insert(0, os.path.dirname(os.path.abspath(script)))
+
+    returncode = 0
+    try:
+        runpy.run_path(script, run_name="__main__")
+    except SystemExit as e:
+        returncode = _exit_code(e)
+    except BaseException as e:  # noqa: BLE001
+        _print_exception(e, script)
+        returncode = 1
+    try:
+        atexit._run_exitfuncs()
+        sys.stdout.flush()
+        sys.stderr.flush()
+    except BaseException:  # noqa: BLE001
+        returncode = returncode or 1
+    os._exit(returncode)
+
+
+def _exit_code(e: SystemExit) -> int:
+    # The same conventions as the interpreter for the argument of "sys.exit"
+    if e.code is None:
+        return 0
+    if isinstance(e.code, int):
+        return e.code & 0xFF
+    print(e.code, file=sys.stderr)
+    return 1
+
+
+def _print_exception(e: BaseException, script: str) -> None:
+    # Skip the frames from this module and "runpy" so that the traceback looks
+    # like the script was run directly
+    import traceback
+
+    tb = e.__traceback__
+    script = os.path.abspath(script)
+    while tb is not None and os.path.abspath(tb.tb_frame.f_code.co_filename) != script:
+        tb = tb.tb_next
+    traceback.print_exception(type(e), e, tb or e.__traceback__)
+
+
+def _connect_or_start(
+    preload: List[str], idle_timeout: float
+) -> Optional[socket.socket]:
+    if not (
+        hasattr(os, "fork")
+        and hasattr(socket, "AF_UNIX")
+        and hasattr(socket, "send_fds")
+    ):
+        return None
+    try:
+        address = _address(preload)
+    except OSError:
+        return None
+    conn = _connect(address)
+    if conn is not None:
+        return conn
+
+    import subprocess
+
+    command = [sys.executable, os.path.abspath(__file__)]
+    for module in preload:
+        command += ["--preload", module]
+    command += ["--idle-timeout", str(idle_timeout), "--serve", address]
+    subprocess.Popen(
+        command,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while conn is None and time.monotonic() < deadline:
+        time.sleep(0.02)
+        conn = _connect(address)
+    return conn
+
+
+def _connect(address: str) -> Optional[socket.socket]:
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.connect(address)
+    except OSError:
+        conn.close()
+        return None
+    return conn
+
+
+def _address(preload: List[str]) -> str:
+    # The sockets are stored in a private directory for each user, and there is
+    # a separate server for each interpreter, set of preloaded modules, import
+    # environment, and version of this file
+    tmp = os.environ.get("TMPDIR") or "/tmp"
+    directory = os.path.join(tmp, f"showyourwork2-{os.getuid()}")
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    info = os.stat(directory)
+    if info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise OSError(f"Insecure worker directory: '{directory}'")
+    source = os.stat(__file__)
+    environment = [os.environ.get(name) for name in IMPORT_ENVIRONMENT]
+    key = [sys.executable, preload, environment, source.st_size, source.st_mtime_ns]
+    return os.path.join(directory, hashlib.sha256(marshal.dumps(key)).hexdigest()[:16])
+
+
+def _recv_request(conn: socket.socket) -> Tuple[Dict[str, Any], List[int]]:
+    header, fds, _, _ = socket.recv_fds(conn, HEADER_SIZE, 3)
+    while len(header) < HEADER_SIZE:
+        chunk = conn.recv(HEADER_SIZE - len(header))
+        if not chunk:
+            os._exit(1)
+        header += chunk
+    size = int.from_bytes(header, "big")
+    data = b""
+    while len(data) < size:
+        chunk = conn.recv(size - len(data))
+        if not chunk:
+            os._exit(1)
+        data += chunk
+    return marshal.loads(data), list(fds)
+
+
+def _recv_all(conn: socket.socket) -> bytes:
+    data = b""
+    while True:
+        chunk = conn.recv(1 << 16)
+        if not chunk:
+            return data
+        data += chunk
+
+
+def _exec_directly(args: List[str]) -> NoReturn:
+    os.execv(sys.executable, [sys.executable, *args])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,5 @@
 import json
-import inspect
-from showyourwork2.dependencies import simplify_dependency_tree
+from showyourwork2.dependencies import DependencyGraph, dependency_tree_from_dag
 
 SYW__DAG_FLAG = SYW__WORK_PATHS.flag("dag")
 
@@ -33,8 +32,6 @@ def get_document_dependencies(document):
     return impl
 
 def ensure_all_document_dependencies(*_):
-    from collections import defaultdict
-
     # This checkpoint call serves two purposes: (1) it makes sure that we have
     # extracted the list of all dependencies from the document, and (2) it
     # ensures that the DAG of jobs has been constructed.
@@ -44,37 +41,36 @@ def ensure_all_document_dependencies(*_):
         )
         getattr(checkpoints, checkpoint_name).get()
 
-    # Walk up the call stack to find an object called "dag"... yeah, this is a
-    # hack, but we haven't found a better approach yet!
-    dag = None
-    for level in inspect.stack():
-        dag = level.frame.f_locals.get("dag", None)
-        if dag is not None:
-            break
-
-    # If "dag" is still None, then we couldn't find it. We shouldn't ever hit
-    # this (until snakemake renames the variable...), but we have a check just
-    # to be sure.
-    if dag is None:
+    # Snakemake sets up the persistence layer, which holds a reference to the
+    # DAG, before evaluating any input functions.
+    persistence = workflow.persistence
+    if persistence is None:
         raise RuntimeError(
-            "Could not find DAG object in call stack. This error shouldn't "
-            "ever be hit, but you found it! Please report the issue on the "
+            "Could not access the DAG object. This error shouldn't ever be "
+            "hit, but you found it! Please report the issue on the "
             "showyourwork GitHub page."
         )
 
     # Map the full tree of data dependencies. Here we're collecting the
     # "parents" for every file that has a rule defined.
-    parents = defaultdict(set)
-    for job in dag.jobs:
-        for output in job.output:
-            parents[output] |= set(str(f) for f in job.input)
-    parents = {k: list(sorted(v)) for k, v in parents.items()}
+    parents = dependency_tree_from_dag(persistence.dag)
 
     # Store the dependency tree in the global "config" object. This is also a
     # bit of a hack, but this gives us a nice way to provide downstream rules
     # with access to the computed dependency tree.
     config._dependency_tree = parents
-    config._dependency_tree_simple = simplify_dependency_tree(parents, SYW__WORK_PATHS.root)
+
+    # This function is evaluated every time the DAG is updated, so we keep the
+    # dependency graph around and only update the outputs that have changed.
+    graph = config._dependency_graph
+    if graph is None or not set(graph.tree).issubset(parents):
+        graph = DependencyGraph(parents, SYW__WORK_PATHS.root)
+        config._dependency_graph = graph
+    else:
+        for output, inputs in parents.items():
+            if graph.tree.get(output) != inputs:
+                graph.update(output, inputs)
+    config._dependency_tree_simple = graph.simplify()
 
     return []
 
@@ -7,6 +7,39 @@ scripts = {
     "py": "python {script} {output}",
     "ipynb": "jupyter execute {script}",
 }
+
+# Optionally, cache the outputs of scripts in a directory shared between
+# projects. The commands in the cache keys don't depend on how the interpreter
+# is started, so that the same entries are used with or without workers.
+if config.output_cache is not None:
+    import shlex
+    import sys
+    from showyourwork2.cache import cache_key, user_cache_dir
+
+    cache_commands = dict(scripts, **config.scripts)
+    cache_dir = config.output_cache.directory or user_cache_dir() / "outputs"
+
+    # The interpreter is part of the command rather than a rule parameter, since
+    # Snakemake reruns jobs when their parameters change, and it would differ
+    # when showyourwork is run from another environment
+    cache_python = shlex.quote(sys.executable).replace("{", "{{").replace("}", "}}")
+
+# Optionally, run Python scripts and notebooks using a pool of pre-warmed
+# interpreters, executing notebooks in an IPython shell instead of a new kernel
+if config.python_workers is not None:
+    import shlex
+
+    def _worker_command(*preload):
+        command = [str(package_data("showyourwork2", "worker.py"))]
+        for module in [*preload, *config.python_workers.preload]:
+            command += ["--preload", module]
+        command += ["--idle-timeout", str(config.python_workers.idle_timeout)]
+        return f"python {shlex.join(command)}"
+
+    _notebook = shlex.quote(str(package_data("showyourwork2", "notebook.py")))
+    scripts["py"] = f"{_worker_command()} {{script}} {{output}}"
+    scripts["ipynb"] = f"{_worker_command('IPython')} {_notebook} {{script}}"
+
 scripts = dict(scripts, **config.scripts)
 
 for dynamic in config.dynamic:
@@ -15,9 +48,8 @@ for dynamic in config.dynamic:
     message = f"Running script '{script}'"
     input = dynamic.input
     output = dynamic.output
-    conda = dynamic.conda or config.conda
-    if conda is not None:
-        conda = repo_path / conda
+    conda_file = dynamic.conda or config.conda
+    conda = None if conda_file is None else repo_path / conda_file
 
     suffix = Path(script).suffix[1:]
     if suffix not in scripts:
@@ -27,6 +59,29 @@ for dynamic in config.dynamic:
         )
     command = scripts[suffix].format(script=script, output=" ".join(map(str, output)))
 
+    # Restore the outputs from the cache if the script, its inputs, and its
+    # environment are unchanged, and otherwise run it and cache the outputs.
+    # The files are hashed by their paths relative to the project root, so that
+    # different clones of a project share the same entries.
+    cache_params = {}
+    if config.output_cache is not None and output:
+        cache_params = dict(
+            cache_dir=cache_dir,
+            cache_size=config.output_cache.max_size_mb * 1024 * 1024,
+            cache_key=cache_key(cache_commands[suffix], list(map(str, output))),
+            cache_files=[*input, script, *([] if conda_file is None else [conda_file])],
+        )
+        cache_command = (
+            "{python} -m showyourwork2.cache {action} {{params.cache_dir:q}} "
+            "{{params.cache_size}} {{params.cache_key:q}} {{output:q}} -- "
+            "{{params.cache_files:q}}"
+        )
+        cache_restore, cache_store = (
+            cache_command.format(python=cache_python, action=action)
+            for action in ["restore-outputs", "store-outputs"]
+        )
+        command = f"{cache_restore} || ( {command} && {cache_store} )"
+
     if conda is None:
         rule:
             name:
@@ -37,6 +92,14 @@ for dynamic in config.dynamic:
                 input, script=script
             output:
                 output
+            threads:
+                dynamic.threads
+            resources:
+                **dynamic.resources
+            params:
+                **cache_params
+            priority:
+                dynamic.priority
             shell:
                 command
 
@@ -50,6 +113,14 @@ for dynamic in config.dynamic:
                 input, script=script
             output:
                 output
+            threads:
+                dynamic.threads
+            resources:
+                **dynamic.resources
+            params:
+                **cache_params
+            priority:
+                dynamic.priority
             conda:
                 conda
             shell:
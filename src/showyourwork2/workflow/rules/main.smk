@@ -19,5 +19,7 @@ for document in SYW__DOCUMENTS:
             doc
         output:
             SYW__WORK_PATHS.root / doc
+        params:
+            strategy=config.materialize,
         run:
-            utils.copy_file_or_directory(input[0], output[0])
+            utils.copy_file_or_directory(input[0], output[0], strategy=params.strategy)
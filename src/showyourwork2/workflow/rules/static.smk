@@ -8,5 +8,7 @@ for static_file in config.static:
             static_file
         output:
             directory(build_path / static_file) if Path(static_file).is_dir() else build_path / static_file
+        params:
+            strategy=config.materialize,
         run:
-            utils.copy_file_or_directory(input[0], output[0])
+            utils.copy_file_or_directory(input[0], output[0], strategy=params.strategy)
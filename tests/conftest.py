@@ -0,0 +1,11 @@
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    # Don't use, or modify, the cache of the user running the tests
+    path = tmp_path / "cache"
+    monkeypatch.setenv("SHOWYOURWORK_CACHE_DIR", str(path))
+    return path
@@ -0,0 +1,87 @@
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+from showyourwork2.config import parse_config
+from showyourwork2.paths import find_project_root
+from showyourwork2.plugins.tex import dependencies
+from showyourwork2.testing import cwd
+
+
+def parse(
+    tmp_path: Path, events: List[str], dynamic: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    config, _ = parse_config(
+        {"config_version": 2, "documents": ["ms.tex"], "dynamic": dynamic}
+    )
+    xml = tmp_path / "ms.dependencies.xml"
+    xml.write_text("\n".join(events) + "\n")
+    depfile = tmp_path / "ms.dependencies.json"
+
+    # The logger might need to find the project root
+    (tmp_path / "showyourwork.yml").write_text("config-version: 2\n")
+    find_project_root.cache_clear()
+    with cwd(tmp_path):
+        dependencies.parse_dependencies(xml, depfile, tmp_path, tmp_path, config)
+    with open(depfile, "r") as f:
+        return json.load(f)
+
+
+def test_multiple_graphics_paths(tmp_path: Path) -> None:
+    (tmp_path / "b").mkdir()
+    (tmp_path / "b" / "static.pdf").write_text("")
+    result = parse(
+        tmp_path,
+        [
+            "<GRAPHICSPATH>{a/}{b/}</GRAPHICSPATH>",
+            "<GRAPHICS>static.pdf</GRAPHICS>",
+            "<GRAPHICS>dynamic.pdf</GRAPHICS>",
+            "<GRAPHICS>directory/figure.pdf</GRAPHICS>",
+            "<GRAPHICS>missing.pdf</GRAPHICS>",
+            "<GRAPHICSPATH>{c/}</GRAPHICSPATH>",
+            "<FIGURE>",
+            "<GRAPHICS>static.pdf</GRAPHICS>",
+            "<LABEL>fig:static</LABEL>",
+            "</FIGURE>",
+        ],
+        [
+            {"script": "dynamic.py", "output": "b/dynamic.pdf"},
+            {"script": "directory.py", "output": "b/directory"},
+        ],
+    )
+    assert result == {
+        "figures": {"fig:static": ["c/static.pdf"]},
+        "unlabeled": [
+            "b/static.pdf",
+            "b/dynamic.pdf",
+            "b/directory/figure.pdf",
+            "a/missing.pdf",
+        ],
+        "files": [],
+    }
+
+
+def test_streaming(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    # Make sure that elements split across chunks are parsed correctly
+    monkeypatch.setattr(dependencies, "CHUNK_SIZE", 7)
+    events = ["<!--XML article tree automatically generated by showyourwork-->"]
+    for n in range(50):
+        events += [
+            "<FIGURE>",
+            f"<GRAPHICS>figure-{n}.pdf</GRAPHICS>",
+            "<CAPTION />",
+            f"<LABEL>fig:{n}</LABEL>" if n % 2 else "",
+            "</FIGURE>",
+            "<ALIGN>",
+            "<GRAPHICS>ignored.pdf</GRAPHICS>",
+            "</ALIGN>",
+            f"<INPUT>variable-{n}.txt</INPUT>",
+        ]
+    result = parse(tmp_path, events, [])
+    assert result["figures"] == {
+        f"fig:{n}": [f"figure-{n}.pdf"] for n in range(1, 50, 2)
+    }
+    assert result["unlabeled"] == [f"figure-{n}.pdf" for n in range(0, 50, 2)]
+    assert result["files"] == [f"variable-{n}.txt" for n in range(50)]
@@ -0,0 +1,87 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from showyourwork2.config import parse_config
+from showyourwork2.paths import find_project_root
+from showyourwork2.plugins.tex.dependencies import parse_dependencies
+from showyourwork2.plugins.tex.scanner import main, scan_dependencies
+from showyourwork2.testing import cwd
+
+PROJECT = Path("tests/projects/plugins/tex/dependencies").resolve()
+
+
+@pytest.mark.parametrize(
+    "document", ["all.tex", "basic.tex", "figure.tex", "file.tex", "labeled.tex"]
+)
+def test_scanner_matches_tectonic(tmp_path: Path, document: str) -> None:
+    config, _ = parse_config({"config_version": 2, "documents": [document]})
+    xml = tmp_path / "ms.dependencies.xml"
+    xml.write_text(scan_dependencies(PROJECT / document))
+    depfile = tmp_path / "ms.dependencies.json"
+
+    # The logger might need to find the project root
+    (tmp_path / "showyourwork.yml").write_text("config-version: 2\n")
+    find_project_root.cache_clear()
+    with cwd(tmp_path):
+        parse_dependencies(xml, depfile, PROJECT, PROJECT, config)
+
+    expected = PROJECT / "expected" / ".showyourwork" / f"{document}.dependencies.json"
+    with open(depfile, "r") as f, open(expected, "r") as g:
+        assert json.load(f) == json.load(g)
+
+
+def test_scanner_syntax(tmp_path: Path) -> None:
+    (tmp_path / "section.tex").write_text(
+        "\\begin{figure*}[t]\n"
+        "  \\includegraphics*[width=\\linewidth]{b.pdf}\n"
+        "  \\label{fig:b}\n"
+        "\\end{figure*}\n"
+    )
+    (tmp_path / "ms.tex").write_text(
+        "\\newcommand{\\answer}{42} % \\includegraphics{comment.pdf}\n"
+        "\\graphicspath{{figures/}}\n"
+        "\\begin{document}\n"
+        "100\\% \\includegraphics{a.pdf}\n"
+        "\\iffalse \\ifx a b \\fi \\includegraphics{disabled.pdf} \\fi\n"
+        "\\begin{verbatim}\\includegraphics{verbatim.pdf}\\end{verbatim}\n"
+        "\\input{section}\n"
+        "\\variable{output/value.txt}\n"
+        "\\end{document}\n"
+        "\\includegraphics{after.pdf}\n"
+    )
+    xml = scan_dependencies(tmp_path / "ms.tex")
+    assert xml.splitlines()[1:] == [
+        "<GRAPHICSPATH>{figures/}</GRAPHICSPATH>",
+        "<GRAPHICS>a.pdf</GRAPHICS>",
+        "<FIGURE>",
+        "<GRAPHICS>b.pdf</GRAPHICS>",
+        "<LABEL>fig:b</LABEL>",
+        "</FIGURE>",
+        "<INPUT>output/value.txt</INPUT>",
+    ]
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "\\includegraphics{\\figdir/a.pdf}",
+        "\\newcommand{\\fig}[1]{\\includegraphics{#1}}",
+        "\\def\\fig{\\begin{figure}}",
+        "\\let\\oldinput\\input",
+        "\\input{missing}",
+        "\\includegraphics{a.pdf",
+        # Figure commands defined by the aastex class
+        "\\begin{figure}\\plotone{figures/a.pdf}\\caption{A}\\end{figure}",
+        "\\begin{figure}\\plottwo{a.pdf}{b.pdf}\\end{figure}",
+        "\\begin{figure*}\\fig{a.png}{0.5\\textwidth}{(a)}\\end{figure*}",
+        "\\begin{figure}\\plotone{a}\\end{figure}",
+    ],
+)
+def test_scanner_fallback(tmp_path: Path, source: str) -> None:
+    document = tmp_path / "ms.tex"
+    document.write_text(source)
+    output = tmp_path / "ms.dependencies.xml"
+    assert main([str(output), str(document)]) == 1
+    assert not output.exists()
@@ -0,0 +1,36 @@
+import gzip
+from pathlib import Path
+
+import pytest
+
+from showyourwork2.plugins.tex import synctex
+from showyourwork2.testing import cwd
+
+
+def test_fix_synctex_paths(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    # Make sure that lines are written correctly across batches
+    monkeypatch.setattr(synctex, "BATCH_SIZE", 3)
+    (tmp_path / "ms.tex").write_text("")
+    build_dir = tmp_path / ".showyourwork" / "build"
+    lines = [
+        "SyncTeX Version:1",
+        f"Input:1:{build_dir / 'ms.tex'}",
+        f"Input:2:{build_dir / 'missing.tex'}",
+        "Input:3:/usr/share/texmf/article.cls",
+        "Output:pdf",
+    ] + [f"x1,{n}:0,0" for n in range(10)]
+    lines.append(f"Input:4:{build_dir / 'ms.tex'}")
+    source = tmp_path / "ms.synctex.gz"
+    target = tmp_path / "ms.fixed.synctex.gz"
+    with gzip.open(source, "wt") as f:
+        f.write("\n".join(lines))
+
+    with cwd(tmp_path):
+        synctex.fix_synctex_paths(build_dir, source, target)
+
+    with gzip.open(target, "rt") as f:
+        result = f.read()
+    expected = list(lines)
+    expected[1] = f"Input:1:{(tmp_path / 'ms.tex').resolve()}"
+    expected[-1] = f"Input:4:{(tmp_path / 'ms.tex').resolve()}"
+    assert result == "\n".join(expected) + "\n"
@@ -1,3 +1,5 @@
+import json
+from pathlib import Path
 from typing import Any
 
 import pytest
@@ -6,7 +8,7 @@ from pydantic import ValidationError
 from showyourwork2.config import parse_config
 from showyourwork2.paths import package_data
 from showyourwork2.plugins.tex.models import ThemeModel
-from showyourwork2.plugins.tex.theme import Theme
+from showyourwork2.plugins.tex.theme import Theme, _get_environment, stage_resources
 
 
 @pytest.mark.parametrize(
@@ -83,3 +85,67 @@ def test_classic_theme(spec: Any) -> None:
     assert theme.resources_for_template("build") != {}
     theme.render("dependencies.tex", {})
     theme.render("build.tex", {})
+
+
+def test_theme_cache(tmp_path: Path) -> None:
+    model = ThemeModel.model_validate("classic")
+    theme = Theme(model, cache_dir=tmp_path)
+    other = Theme(model, cache_dir=tmp_path)
+    assert theme._hierarchy == other._hierarchy
+    assert theme.resources_for_template("build") == other.resources_for_template(
+        "build"
+    )
+
+    # Modifying one theme shouldn't affect the shared state
+    theme.config["modified"] = True
+    theme.resources_for_template("build").clear()
+    assert "modified" not in other.config
+    assert other.resources_for_template("build") != {}
+
+    # Compiled templates are stored in the cache directory
+    expected = theme.render("build.tex", {})
+    assert any(tmp_path.iterdir())
+    _get_environment.cache_clear()
+    assert other.render("build.tex", {}) == expected
+
+
+def test_render_to(tmp_path: Path) -> None:
+    (tmp_path / "theme").mkdir()
+    (tmp_path / "theme" / "theme.yml").write_text("extends: base\n")
+    (tmp_path / "theme" / "build.tex").write_text(
+        "((* extends 'base.tex' *))((* block body *))((- config.verbose -))"
+        "((- config['materialize'] -))((* endblock *))"
+    )
+    (tmp_path / "theme" / "base.tex").write_text(
+        "((* block body *))((* endblock *)) ((- dependencies -))"
+    )
+    theme = Theme(ThemeModel.model_validate({"path": tmp_path / "theme"}))
+    assert theme.uses("build.tex", "config")
+    assert theme.uses("build.tex", "dependencies")
+    assert not Theme(ThemeModel.model_validate("base")).uses(
+        "build.tex", "dependencies"
+    )
+
+    config, _ = parse_config({"config_version": 2, "documents": ["ms.tex"]})
+    target = tmp_path / "showyourwork.tex"
+    theme.render_to("build.tex", target, config, {"a": 1})
+    assert target.read_text() == "Falsecopy {'a': 1}"
+
+
+def test_stage_resources(tmp_path: Path) -> None:
+    theme = Theme(ThemeModel.model_validate("classic"))
+    resources = theme.resources_for_template("build")
+    target = tmp_path / "build"
+    manifest = tmp_path / "resources.json"
+    (target / "xstring.sty").parent.mkdir()
+    (target / "xstring.sty").write_text("stale")
+    stage_resources(resources, target, manifest)
+    for name, source in resources.items():
+        assert (target / name).read_bytes() == source.read_bytes()
+    assert json.loads(manifest.read_text()) == {
+        str(k): str(v) for k, v in resources.items()
+    }
+
+    # Staging again is a no-op
+    stage_resources(resources, target, manifest)
+    assert (target / "xstring.sty").samefile(resources[Path("xstring.sty")])
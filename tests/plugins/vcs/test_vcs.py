@@ -74,3 +74,23 @@ def test_vcs_files(repo_root: str) -> None:
             # We should also discover the dependencies after committing
             git.commit("Initial commit")
             run_and_check_config()
+
+
+@pytest.mark.parametrize("repo_root", ["", "repo_root"])
+def test_vcs_git_index_state(repo_root: str) -> None:
+    with TemporaryDirectory("vcs_state") as d:
+        path = Path(d) / repo_root
+        path.mkdir(parents=True, exist_ok=True)
+        git.git(["init", "."], cwd=d)
+        with cwd(path):
+            initial = vcs.models.git_index_state()
+            assert initial is not None
+            assert vcs.models.git_index_state() == initial
+
+            # Both staging and committing files should change the state
+            open("file.tex", "w").close()
+            git.git(["add", "file.tex"])
+            staged = vcs.models.git_index_state()
+            assert staged != initial
+            git.commit("Initial commit")
+            assert vcs.models.git_index_state() not in (initial, staged)
@@ -0,0 +1,119 @@
+from pathlib import Path
+from typing import List, Tuple
+
+import pytest
+
+from showyourwork2 import cache
+from showyourwork2.cli import get_config_file_and_project_root
+from showyourwork2.paths import find_project_root
+from showyourwork2.testing import cwd
+
+
+def test_round_trip() -> None:
+    key = cache.cache_key("a", ["b", "c"])
+    assert cache.load("test", key) is None
+    cache.save("test", key, {"value": 1})
+    assert cache.load("test", key) == {"value": 1}
+    assert cache.load("test", cache.cache_key("a", ["b"])) is None
+
+
+def test_eviction() -> None:
+    for n in range(cache.MAX_ENTRIES + 1):
+        cache.save("test", str(n), n)
+    assert cache.load("test", "0") is None
+    assert cache.load("test", str(cache.MAX_ENTRIES)) == cache.MAX_ENTRIES
+
+
+def test_corrupted(cache_dir: Path) -> None:
+    cache_dir.mkdir(parents=True)
+    (cache_dir / "test.json").write_text("not json")
+    assert cache.load("test", "key") is None
+    cache.save("test", "key", "value")
+    assert cache.load("test", "key") == "value"
+
+
+def test_project_root(tmp_path: Path) -> None:
+    project = tmp_path / "project"
+    project.mkdir()
+    config_file = project / "showyourwork.yml"
+    config_file.write_text("config_version: 2\n")
+    find_project_root.cache_clear()
+    with cwd(project):
+        expected: Tuple[Path, Path, List[str]] = (config_file, project, [])
+        assert get_config_file_and_project_root() == expected
+        assert cache.load("project_root", cache.cache_key(str(project), []))
+        assert get_config_file_and_project_root() == expected
+
+        # The cached result is invalidated when the config file disappears
+        config_file.unlink()
+        with pytest.raises(RuntimeError):
+            get_config_file_and_project_root()
+
+
+def test_hash_files(tmp_path: Path) -> None:
+    (tmp_path / "a").write_text("a")
+    (tmp_path / "b").mkdir()
+    (tmp_path / "b" / "c").write_text("c")
+    files = [tmp_path / "a", tmp_path / "b"]
+    key = cache.hash_files(files)
+    assert cache.hash_files(files) == key
+    assert cache.hash_files(files, "extra") != key
+
+    (tmp_path / "b" / "c").write_text("d")
+    assert cache.hash_files(files) != key
+
+
+def test_restore_output(tmp_path: Path) -> None:
+    document = tmp_path / "ms.tex"
+    document.write_text("\\begin{document}\\end{document}")
+    output = tmp_path / "ms.dependencies.xml"
+    args = ["test", str(output), str(document)]
+
+    assert cache.main(["restore"] + args) == 1
+    assert not output.exists()
+
+    output.write_text("<INPUT>variable.txt</INPUT>")
+    assert cache.main(["store"] + args) == 0
+    output.unlink()
+    assert cache.main(["restore"] + args) == 0
+    assert output.read_text() == "<INPUT>variable.txt</INPUT>"
+
+    document.write_text("\\begin{document}Changed\\end{document}")
+    assert cache.main(["restore"] + args) == 1
+
+
+def test_restore_outputs(tmp_path: Path) -> None:
+    (tmp_path / "script.py").write_text("print('figure')")
+    (tmp_path / "data.txt").write_text("data")
+    outputs = [str(tmp_path / "figure.pdf"), str(tmp_path / "tables")]
+    inputs = [str(tmp_path / "script.py"), str(tmp_path / "data.txt")]
+    args = [str(tmp_path / "outputs"), "1000", "python {script}", *outputs, "--"]
+
+    assert cache.main(["restore-outputs", *args, *inputs]) == 1
+    (tmp_path / "figure.pdf").write_bytes(b"%PDF")
+    (tmp_path / "tables").mkdir()
+    (tmp_path / "tables" / "table.tex").write_text("table")
+    assert cache.main(["store-outputs", *args, *inputs]) == 0
+
+    (tmp_path / "figure.pdf").unlink()
+    (tmp_path / "tables" / "table.tex").unlink()
+    assert cache.main(["restore-outputs", *args, *inputs]) == 0
+    assert (tmp_path / "figure.pdf").read_bytes() == b"%PDF"
+    assert (tmp_path / "tables" / "table.tex").read_text() == "table"
+
+    (tmp_path / "data.txt").write_text("changed")
+    assert cache.main(["restore-outputs", *args, *inputs]) == 1
+
+
+def test_output_eviction(tmp_path: Path) -> None:
+    directory = tmp_path / "outputs"
+    output = tmp_path / "figure.pdf"
+    for n in range(3):
+        output.write_bytes(bytes(40))
+        cache.store_outputs(directory, cache.cache_key(n), [output], 100)
+        # The first entry is used again before the third one is stored
+        if n == 1:
+            assert cache.restore_outputs(directory, cache.cache_key(0), [output])
+    assert cache.restore_outputs(directory, cache.cache_key(0), [output])
+    assert not cache.restore_outputs(directory, cache.cache_key(1), [output])
+    assert cache.restore_outputs(directory, cache.cache_key(2), [output])
@@ -0,0 +1,86 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from showyourwork2.cli import main
+from showyourwork2.manifest import delete_outputs
+from showyourwork2.objects import ObjectStore
+from showyourwork2.paths import find_project_root
+from showyourwork2.testing import cwd, run_showyourwork
+from showyourwork2.utils import copy_file_or_directory
+
+
+@pytest.mark.parametrize("in_process", [False, True])
+def test_in_process(in_process: bool) -> None:
+    with run_showyourwork(
+        "tests/projects/dependency_tree",
+        "syw__save_config",
+        check_exists=False,
+        check_contents=False,
+        in_process=in_process,
+    ) as d:
+        assert (d / "config.json").is_file()
+
+
+def test_clean_from_manifest() -> None:
+    with run_showyourwork(
+        "tests/projects/dependency_tree",
+        "syw__save_config",
+        check_exists=False,
+        check_contents=False,
+    ) as d:
+        manifest = d / ".showyourwork" / "manifest.json"
+        assert "config.json" in json.loads(manifest.read_text())
+
+        find_project_root.cache_clear()
+        with cwd(d):
+            result = CliRunner().invoke(main, ["clean"])
+        assert result.exit_code == 0, result.output
+        assert not (d / "config.json").exists()
+        assert not manifest.exists()
+
+
+def test_clean_links(tmp_path: Path) -> None:
+    # Outputs that are links, or inside linked directories, must be deleted
+    # without touching their targets
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "x.txt").write_text("data")
+    (tmp_path / "ms.tex").write_text("ms")
+    work = tmp_path / ".showyourwork"
+    (work / "static").mkdir(parents=True)
+    copy_file_or_directory(
+        tmp_path / "data", work / "static" / "data", strategy="symlink"
+    )
+    copy_file_or_directory(tmp_path / "ms.tex", work / "ms.tex", strategy="symlink")
+    os.symlink(tmp_path / "data", work / "linked")
+    store = ObjectStore(work / "objects")
+    store.link(tmp_path / "data", work / "build" / "data")
+    obj = (work / "build" / "data" / "x.txt").resolve()
+
+    outputs = ["static/data", "ms.tex", "linked/x.txt", "linked", "build/data"]
+    manifest = work / "manifest.json"
+    manifest.write_text(json.dumps([f".showyourwork/{o}" for o in outputs]))
+    delete_outputs(manifest, tmp_path)
+    for output in outputs:
+        assert not os.path.lexists(work / output)
+    assert (tmp_path / "data" / "x.txt").read_text() == "data"
+    assert (tmp_path / "ms.tex").read_text() == "ms"
+    assert obj.read_text() == "data"
+
+
+def test_lazy_imports() -> None:
+    code = (
+        "import sys, showyourwork2.cli; "
+        "print(' '.join(m for m in sys.modules if '.' not in m))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    )
+    modules = set(result.stdout.split())
+    for heavy in ["snakemake", "pydantic", "yaml", "pluggy", "ensureconda"]:
+        assert heavy not in modules
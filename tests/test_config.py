@@ -1,12 +1,13 @@
+import sys
 from contextlib import contextmanager
 from pathlib import Path
 from tempfile import TemporaryDirectory
-from typing import Generator
+from typing import Any, Dict, Generator
 
 import pytest
 from pydantic import ValidationError
 
-from showyourwork2.config.config import load_config, normalize_keys
+from showyourwork2.config.config import load_config, normalize_keys, parse_config
 
 
 def test_normalize_keys() -> None:
@@ -22,6 +23,18 @@ def test_normalize_keys() -> None:
     }
 
 
+def test_normalize_keys_deep() -> None:
+    # This would exceed the recursion limit for a recursive implementation
+    depth = 5000
+    config: Dict[str, Any] = {"a-b": 1}
+    for _ in range(depth):
+        config = {"c-d": [config]}
+    result = normalize_keys(config)
+    for _ in range(depth):
+        result = result["c_d"][0]
+    assert result == {"a_b": 1}
+
+
 @contextmanager
 def temp_config_file(body: str) -> Generator[Path, None, None]:
     with TemporaryDirectory() as d:
@@ -104,3 +117,82 @@ documents:
         assert config.documents[1].dependencies == []
         assert config.documents[2].path == Path("test3")
         assert config.documents[2].dependencies == [Path("dep1"), Path("dep2")]
+
+
+def test_cached_config(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("SHOWYOURWORK_CACHE_DIR", str(tmp_path))
+    raw = {"config_version": 2, "documents": ["ms.tex"]}
+    config, _ = parse_config(dict(raw))
+    assert len(list((tmp_path / "config").iterdir())) == 1
+
+    # The cached config should be identical, without duplicated artifacts
+    cached, _ = parse_config(dict(raw))
+    assert cached == config
+    assert cached.documents[0].artifacts == [Path("ms.pdf"), Path("ms.synctex.gz")]
+    assert len(list((tmp_path / "config").iterdir())) == 1
+
+    # Changing the config invalidates the cache
+    parse_config({"config_version": 2, "documents": ["other.tex"]})
+    assert len(list((tmp_path / "config").iterdir())) == 2  # noqa: PLR2004
+
+    # So does switching to a different environment
+    monkeypatch.setattr(sys, "prefix", str(tmp_path / "env"))
+    parse_config(dict(raw))
+    assert len(list((tmp_path / "config").iterdir())) == 3  # noqa: PLR2004
+
+
+def test_dynamic_resources() -> None:
+    with temp_config_file(
+        """
+config-version: 2
+documents: ["ms.tex"]
+dynamic:
+    - script: mcmc.py
+      output: chains.h5
+      threads: 4
+      priority: 10
+      resources:
+        mem_mb: 16000
+        runtime: 2h
+        gpu: 1
+    - script: plot.py
+"""
+    ) as f:
+        config = load_config(f)
+        assert config.dynamic[0].threads == 4  # noqa: PLR2004
+        assert config.dynamic[0].priority == 10  # noqa: PLR2004
+        assert config.dynamic[0].resources == {
+            "mem_mb": 16000,
+            "runtime": "2h",
+            "gpu": 1,
+        }
+        assert config.dynamic[1].threads == 1
+        assert config.dynamic[1].resources == {}
+
+
+def test_invalid_dynamic_threads() -> None:
+    with temp_config_file(
+        """
+config-version: 2
+documents: ["ms.tex"]
+dynamic:
+    - script: mcmc.py
+      threads: 0
+"""
+    ) as f:
+        with pytest.raises(ValidationError):
+            load_config(f)
+
+
+@pytest.mark.parametrize("value", ["true", "false", "{max_size_mb: 10}"])
+def test_output_cache(value: str) -> None:
+    with temp_config_file(
+        f"config-version: 2\ndocuments: ['ms.tex']\noutput-cache: {value}"
+    ) as f:
+        config = load_config(f)
+        if value == "false":
+            assert config.output_cache is None
+        else:
+            assert config.output_cache is not None
+            assert config.output_cache.directory is None
+            assert config.output_cache.max_size_mb == (10 if "10" in value else 1024)
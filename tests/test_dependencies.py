@@ -1,8 +1,16 @@
 import json
 from pathlib import Path
+from types import SimpleNamespace
 from typing import List
 
-from showyourwork2.dependencies import simplify_dependency_tree
+import pytest
+
+from showyourwork2.dependencies import (
+    DependencyGraph,
+    DirectoryIndex,
+    dependency_tree_from_dag,
+    simplify_dependency_tree,
+)
 from showyourwork2.testing import run_showyourwork
 
 
@@ -52,3 +60,91 @@ def test_simplify_with_directory() -> None:
     }
     output_tree = simplify_dependency_tree(input_tree, work_path)
     assert output_tree == {"a": ["c", "d"]}
+
+
+def test_directory_index() -> None:
+    index = DirectoryIndex([work("a"), work("a", "b"), work("c")])
+    assert index.find(work("a", "b", "c")) == work("a")
+    assert index.find(work("c")) == work("c")
+    assert index.find(work("cd")) is None
+    assert index.find(repo("a")) is None
+
+
+def test_simplify_deep_chain() -> None:
+    n = 100_000
+    input_tree = {work(f"{k}"): [work(f"{k + 1}")] for k in range(n)}
+    input_tree[work(f"{n}")] = [repo("b")]
+    input_tree[repo("a")] = [work("0")]
+    output_tree = simplify_dependency_tree(input_tree, work_path)
+    assert output_tree == {"a": ["b"]}
+
+
+def test_simplify_diamonds() -> None:
+    # Without memoization, this tree would be expanded 2^n times
+    n = 100
+    input_tree = {repo("a"): [work("0", "x")], work(f"{n}"): [repo("b")]}
+    for k in range(n):
+        input_tree[work(f"{k}")] = [work(f"{k + 1}", "x"), work(f"{k + 1}", "y")]
+    output_tree = simplify_dependency_tree(input_tree, work_path)
+    assert output_tree == {"a": ["b"]}
+
+
+def test_simplify_cycle() -> None:
+    input_tree = {
+        repo("a"): [work("b")],
+        work("b"): [work("c")],
+        work("c"): [work("b", "d")],
+    }
+    with pytest.raises(ValueError, match="cycle"):
+        simplify_dependency_tree(input_tree, work_path)
+
+
+def test_topological_order() -> None:
+    input_tree = {
+        repo("a"): [work("b"), repo("c")],
+        repo("c"): [work("d", "e")],
+        work("b"): [work("d")],
+        work("d"): [repo("e")],
+    }
+    graph = DependencyGraph(input_tree, work_path)
+    order = graph.topological_order()
+    assert set(order) == set(input_tree)
+    for file, parents in input_tree.items():
+        for parent in parents:
+            node = graph.node_for(parent)
+            if node is not None:
+                assert order.index(node) < order.index(file)
+
+
+def test_graph_update() -> None:
+    input_tree = {
+        repo("a"): [work("b")],
+        repo("c"): [repo("d")],
+        work("b"): [repo("e")],
+    }
+    graph = DependencyGraph(input_tree, work_path)
+    assert graph.simplify() == {"a": ["e"], "c": ["d"]}
+
+    assert graph.update(work("b"), [repo("f")]) == {repo("a")}
+    assert graph.simplify() == {"a": ["f"], "c": ["d"]}
+
+    # Adding a new directory output affects the files that it contains
+    assert graph.update(work("g"), [repo("h")]) == set()
+    assert graph.update(repo("c"), [work("g", "i")]) == {repo("c")}
+    assert graph.simplify() == {"a": ["f"], "c": ["h"]}
+    assert graph.downstream([repo("h")]) == {work("g"), repo("c")}
+
+
+def test_dependency_tree_from_dag() -> None:
+    dag = SimpleNamespace(
+        jobs=[
+            SimpleNamespace(input=[Path("c"), Path("b")], output=[Path("a")]),
+            SimpleNamespace(input=[Path("d")], output=[Path("b"), Path("e")]),
+        ]
+    )
+    tree = dependency_tree_from_dag(dag)
+    assert tree == {"a": ["b", "c"], "b": ["d"], "e": ["d"]}
+    assert tree["b"] is tree["e"]
+    # The input "b" and the output "b" should be the same interned string
+    (key,) = [k for k in tree if k == "b"]
+    assert tree["a"][0] is key
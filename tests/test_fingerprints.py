@@ -0,0 +1,108 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+import snakemake
+from snakemake.common import Mode
+
+from showyourwork2.fingerprints import FingerprintStore, enable_fingerprints, run
+
+
+def set_mtime(path: Path, mtime: int) -> None:
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_restore_mtimes(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    Path("work").mkdir()
+    Path("script.py").write_text("script")
+    Path("work/figure.pdf").write_text("figure")
+    set_mtime(Path("script.py"), 1_000_000_000)
+    set_mtime(Path("work/figure.pdf"), 2_000_000_000)
+    FingerprintStore("fingerprints").record_job(
+        "figure.pdf", ["script.py", "work/figure.pdf"]
+    )
+
+    # A checkout changes the modification times, but not the contents. Only
+    # the generated files in the working directory are restored.
+    set_mtime(Path("script.py"), 3_000_000_000)
+    set_mtime(Path("work/figure.pdf"), 3_000_000_000)
+    store = FingerprintStore("fingerprints")
+    assert store.restore_mtimes("work") == ["work/figure.pdf"]
+    assert Path("script.py").stat().st_mtime_ns == 3_000_000_000  # noqa: PLR2004
+    assert Path("work/figure.pdf").stat().st_mtime_ns == 2_000_000_000  # noqa: PLR2004
+
+    # Files that have changed since their most recent record are left alone
+    store.record_job("other.pdf", ["work/figure.pdf"])
+    set_mtime(Path("work/figure.pdf"), 4_000_000_000)
+    store.record_job("other.pdf", ["work/figure.pdf"])
+    Path("work/figure.pdf").write_text("edited")
+    set_mtime(Path("work/figure.pdf"), 5_000_000_000)
+    assert FingerprintStore("fingerprints").restore_mtimes("work") == []
+    assert Path("work/figure.pdf").stat().st_mtime_ns == 5_000_000_000  # noqa: PLR2004
+
+    # Links out of the working directory aren't followed
+    Path("work/figure.pdf").write_text("figure")
+    set_mtime(Path("work/figure.pdf"), 6_000_000_000)
+    Path("work/linked").symlink_to(tmp_path)
+    store.record_job("linked.pdf", ["work/linked/script.py"])
+    set_mtime(Path("script.py"), 7_000_000_000)
+    store = FingerprintStore("fingerprints")
+    assert store.restore_mtimes("work") == ["work/figure.pdf"]
+    assert Path("work/figure.pdf").stat().st_mtime_ns == 4_000_000_000  # noqa: PLR2004
+    assert Path("script.py").stat().st_mtime_ns == 7_000_000_000  # noqa: PLR2004
+
+
+def test_skip_unchanged(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    Path("input.txt").write_text("input")
+    command = [sys.executable, "-c", "open('output.txt', 'a').write('run\\n')"]
+    record = str(tmp_path / "cutoff" / "rule")
+
+    def build() -> str:
+        # Snakemake deletes the outputs before running a job
+        Path("output.txt").unlink(missing_ok=True)
+        assert run(record, ["input.txt"], ["output.txt"], command) == 0
+        return Path("output.txt").read_text()
+
+    assert build() == "run\n"
+    os.utime("input.txt", ns=(0, 0))
+    assert build() == "run\n"
+    assert Path(f"{record}.json").exists()
+
+    # Changes to the inputs or the command aren't skipped
+    Path("input.txt").write_text("changed")
+    assert build() == "run\n"
+    command[-1] = command[-1].replace("run", "new")
+    assert build() == "new\n"
+
+    # Failed commands aren't recorded
+    assert run(record, ["input.txt"], ["output.txt"], [sys.executable, "-c", "1/0"])
+    assert not Path(f"{record}.json").exists()
+
+    # Extra inputs are listed before the inputs of the rule, and braces are
+    # escaped for Snakemake
+    prefix = FingerprintStore("fingerprints").skip_unchanged("rule", ["env{1}.yml"])
+    assert prefix.endswith(" --input 'env{{1}}.yml' {input:q} --output {output:q} -- ")
+
+
+@pytest.mark.parametrize(
+    "dryrun,mode", [(True, Mode.default), (False, Mode.subprocess)]
+)
+def test_enable_fingerprints_skipped(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, dryrun: bool, mode: int
+) -> None:
+    # Dry runs and job subprocesses must not modify any files
+    logger = snakemake.logging.logger
+    monkeypatch.setattr(logger, "dryrun", dryrun, raising=False)
+    monkeypatch.setattr(logger, "mode", mode)
+    store = FingerprintStore(tmp_path / "fingerprints")
+
+    def fail(directory: Path) -> None:
+        raise AssertionError("restore_mtimes shouldn't be called")
+
+    monkeypatch.setattr(store, "restore_mtimes", fail)
+    handlers = list(logger.log_handler)
+    enable_fingerprints(store, tmp_path / "work")
+    assert logger.log_handler == handlers
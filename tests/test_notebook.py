@@ -0,0 +1,49 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+from showyourwork2.paths import package_data
+
+pytest.importorskip("IPython")
+
+NOTEBOOK = package_data("showyourwork2", "notebook.py")
+
+
+def run(path: Path, cells: List[Dict[str, Any]]) -> "subprocess.CompletedProcess[str]":
+    path.parent.mkdir(parents=True, exist_ok=True)
+    cells = [{"cell_type": "code", "metadata": {}, **cell} for cell in cells]
+    path.write_text(json.dumps({"cells": cells, "metadata": {}, "nbformat": 4}))
+    return subprocess.run(
+        [sys.executable, str(NOTEBOOK), str(path)], capture_output=True, text=True
+    )
+
+
+def test_notebook(tmp_path: Path) -> None:
+    result = run(
+        tmp_path / "src" / "notebook.ipynb",
+        [
+            {"source": ["x = 1\n", "%time y = x + 1"]},
+            {"source": "1 / 0", "metadata": {"tags": ["raises-exception"]}},
+            {"source": "raise ValueError", "metadata": {"tags": ["skip-execution"]}},
+            {"source": "open('output.txt', 'w').write(str(y))"},
+        ],
+    )
+    assert result.returncode == 0, result.stderr
+    assert (tmp_path / "src" / "output.txt").read_text() == "2"
+    lines = result.stderr.splitlines()
+    assert lines[0].startswith("notebook.ipynb: cell 0 finished in ")
+    assert lines[1].startswith("notebook.ipynb: cell 1 finished in ")
+    assert lines[2].startswith("notebook.ipynb: cell 3 finished in ")
+    assert lines[3].startswith("notebook.ipynb: finished in ")
+
+
+def test_notebook_error(tmp_path: Path) -> None:
+    # The modules in showyourwork2 shouldn't be importable from the notebook
+    result = run(tmp_path / "notebook.ipynb", [{"source": "import utils"}])
+    assert result.returncode == 1
+    assert "No module named 'utils'" in result.stdout
+    assert "notebook.ipynb: cell 0 failed after " in result.stderr
@@ -0,0 +1,110 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from showyourwork2.objects import ObjectStore
+
+
+def test_shared_objects(tmp_path: Path) -> None:
+    store = ObjectStore(tmp_path / "objects")
+    (tmp_path / "figure.pdf").write_text("figure")
+    (tmp_path / "copy.pdf").write_text("figure")
+    (tmp_path / "data" / "sub").mkdir(parents=True)
+    (tmp_path / "data" / "sub" / "a.txt").write_text("figure")
+
+    store.link(tmp_path / "figure.pdf", tmp_path / "ms" / "figure.pdf")
+    store.link(tmp_path / "copy.pdf", tmp_path / "slides" / "figure.pdf")
+    store.link(tmp_path / "data", tmp_path / "ms" / "data")
+    objects = [p for p in (tmp_path / "objects").rglob("*") if p.is_file()]
+    assert len(objects) == 1
+    for path in [
+        tmp_path / "ms" / "figure.pdf",
+        tmp_path / "slides" / "figure.pdf",
+        tmp_path / "ms" / "data" / "sub" / "a.txt",
+    ]:
+        assert path.is_symlink()
+        assert path.samefile(objects[0])
+        assert path.read_text() == "figure"
+    assert not (tmp_path / "ms" / "data").is_symlink()
+
+    # Changing the source creates a new object and replaces the link
+    (tmp_path / "figure.pdf").write_text("updated")
+    store.link(tmp_path / "figure.pdf", tmp_path / "ms" / "figure.pdf")
+    assert (tmp_path / "ms" / "figure.pdf").read_text() == "updated"
+    assert (tmp_path / "slides" / "figure.pdf").read_text() == "figure"
+
+    # Going back to the original contents doesn't touch the old object, which
+    # is shared with other links, so the file is copied instead of linked
+    os.utime(objects[0], (0, 0))
+    (tmp_path / "figure.pdf").write_text("figure")
+    store.link(tmp_path / "figure.pdf", tmp_path / "ms" / "figure.pdf")
+    assert not (tmp_path / "ms" / "figure.pdf").is_symlink()
+    assert (tmp_path / "ms" / "figure.pdf").read_text() == "figure"
+    assert (tmp_path / "ms" / "figure.pdf").stat().st_mtime > 0
+    assert objects[0].stat().st_mtime == 0
+
+
+def test_shared_objects_rebuild(tmp_path: Path) -> None:
+    # Linking a large file into a second place mustn't make the consumers of
+    # the first link out of date (Snakemake only uses checksums for small files)
+    (tmp_path / "fig.txt").write_bytes(b"0" * 2_000_000)
+    (tmp_path / "Snakefile").write_text(
+        """
+from showyourwork2.objects import ObjectStore
+
+store = ObjectStore("objects")
+
+rule all:
+    input:
+        ["a.out", "b.out"]
+
+for name in ["a", "b"]:
+    rule:
+        name:
+            f"link_{name}"
+        input:
+            "fig.txt"
+        output:
+            f"{name}/fig.txt"
+        run:
+            store.link(input[0], output[0])
+
+    rule:
+        name:
+            f"build_{name}"
+        input:
+            f"{name}/fig.txt"
+        output:
+            f"{name}.out"
+        shell:
+            "wc -c {input} > {output}"
+"""
+    )
+
+    def build(*args: str) -> str:
+        command = [sys.executable, "-m", "snakemake", "--cores", "1", *args]
+        result = subprocess.run(
+            command, cwd=tmp_path, capture_output=True, text=True, check=True
+        )
+        return result.stdout + result.stderr
+
+    build("a.out")
+    build("b.out")
+    assert (tmp_path / "a" / "fig.txt").is_symlink()
+    assert (tmp_path / "b" / "fig.txt").is_symlink()
+    assert "Nothing to be done" in build("--dry-run")
+
+
+def test_link_fallback(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    def fail(*args: object) -> None:
+        raise OSError("not supported")
+
+    monkeypatch.setattr(os, "symlink", fail)
+    store = ObjectStore(tmp_path / "objects")
+    (tmp_path / "figure.pdf").write_text("figure")
+    store.link(tmp_path / "figure.pdf", tmp_path / "ms" / "figure.pdf")
+    assert not (tmp_path / "ms" / "figure.pdf").is_symlink()
+    assert (tmp_path / "ms" / "figure.pdf").read_text() == "figure"
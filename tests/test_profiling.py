@@ -0,0 +1,58 @@
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+from showyourwork2.profiling import critical_path, read_max_rss, summarize
+from showyourwork2.testing import run_showyourwork
+
+
+def job(rule: str, inputs: List[str], outputs: List[str], t: float) -> Dict[str, Any]:
+    return {
+        "rule": rule,
+        "input": inputs,
+        "output": outputs,
+        "benchmark": None,
+        "start": 0.0,
+        "end": t,
+        "status": "ok",
+        "max_rss": None,
+    }
+
+
+def test_critical_path() -> None:
+    jobs = [
+        job("a", [], ["a"], 1.0),
+        job("b", [], ["b"], 5.0),
+        job("c", ["a", "b"], ["c"], 1.0),
+        job("d", ["c", "a"], ["d"], 1.0),
+    ]
+    path = critical_path(jobs, "d")
+    assert [j["rule"] for j in path] == ["b", "c", "d"]
+    assert critical_path(jobs, "missing") == []
+    summary = summarize(jobs, ["d"])
+    assert "Critical path to 'd' (7.00s over 3 jobs)" in summary
+
+
+def test_read_max_rss(tmp_path: Path) -> None:
+    benchmark = tmp_path / "benchmark.tsv"
+    benchmark.write_text("s\th:m:s\tmax_rss\n0.1\t0:00:00\t12.5\n0.1\t0:00:00\tNA\n")
+    assert read_max_rss(benchmark) == 12.5  # noqa: PLR2004
+    assert read_max_rss(tmp_path / "missing.tsv") is None
+
+
+def test_profile_build() -> None:
+    with run_showyourwork(
+        "tests/projects/dependency_tree",
+        "h",
+        "--config",
+        "profile=True",
+        check_exists=False,
+        check_contents=False,
+    ) as d:
+        with open(d / ".showyourwork" / "logs" / "profile.json", "r") as f:
+            jobs = json.load(f)
+        assert {tuple(j["output"]) for j in jobs} == {(c,) for c in "abcdefgh"}
+        assert all(j["status"] == "ok" for j in jobs)
+        assert [j["output"] for j in critical_path(jobs, "h")] == [
+            [c] for c in "abcdefgh"
+        ]
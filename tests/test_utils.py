@@ -0,0 +1,58 @@
+import os
+import shutil
+from pathlib import Path
+from typing import get_args
+
+import pytest
+
+from showyourwork2.utils import MaterializeStrategy, copy_file_or_directory
+
+
+@pytest.mark.parametrize("strategy", get_args(MaterializeStrategy))
+def test_copy_file_or_directory(tmp_path: Path, strategy: MaterializeStrategy) -> None:
+    src = tmp_path / "src"
+    (src / "sub").mkdir(parents=True)
+    (src / "a.txt").write_text("a")
+    (src / "sub" / "b.txt").write_text("b" * 100_000)
+
+    copy_file_or_directory(src / "a.txt", tmp_path / "out" / "a.txt", strategy)
+    copy_file_or_directory(src, tmp_path / "dir", strategy)
+    assert (tmp_path / "out" / "a.txt").read_text() == "a"
+    assert (tmp_path / "dir" / "a.txt").read_text() == "a"
+    assert (tmp_path / "dir" / "sub" / "b.txt").read_text() == "b" * 100_000
+
+    # Directories are always recreated
+    assert not (tmp_path / "dir").is_symlink()
+    assert (tmp_path / "dir" / "sub").is_dir()
+
+    linked = (tmp_path / "dir" / "a.txt").samefile(src / "a.txt")
+    assert linked == (strategy in ("hardlink", "symlink"))
+    assert (tmp_path / "dir" / "a.txt").is_symlink() == (strategy == "symlink")
+
+
+@pytest.mark.parametrize("strategy", get_args(MaterializeStrategy))
+def test_copy_file_replaces_link(tmp_path: Path, strategy: MaterializeStrategy) -> None:
+    (tmp_path / "a.txt").write_text("a")
+    (tmp_path / "b.txt").write_text("b")
+    os.symlink(tmp_path / "a.txt", tmp_path / "out.txt")
+
+    # An existing link must be replaced rather than written through
+    copy_file_or_directory(tmp_path / "b.txt", tmp_path / "out.txt", strategy)
+    assert (tmp_path / "a.txt").read_text() == "a"
+    assert (tmp_path / "out.txt").read_text() == "b"
+
+    with pytest.raises(shutil.SameFileError):
+        copy_file_or_directory(tmp_path / "a.txt", tmp_path / "a.txt", strategy)
+    assert (tmp_path / "a.txt").read_text() == "a"
+
+
+def test_copy_file_fallback(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    def fail(*args: object) -> None:
+        raise OSError("not supported")
+
+    monkeypatch.setattr(os, "link", fail)
+    monkeypatch.setattr(os, "copy_file_range", fail, raising=False)
+    (tmp_path / "a.txt").write_text("a")
+    copy_file_or_directory(tmp_path / "a.txt", tmp_path / "b.txt", "hardlink")
+    assert (tmp_path / "b.txt").read_text() == "a"
+    assert not (tmp_path / "b.txt").samefile(tmp_path / "a.txt")
@@ -0,0 +1,107 @@
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Generator, List
+
+import pytest
+
+from showyourwork2.paths import find_project_root
+from showyourwork2.testing import cwd
+from showyourwork2.watch import Watcher
+
+CONFIG = """
+config-version: 2
+documents:
+  - ms.tex
+static:
+  - data.txt
+dynamic:
+  - script: gen.py
+    output: fig.pdf
+"""
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> Generator[Path, None, None]:
+    (tmp_path / "showyourwork.yml").write_text(CONFIG)
+    for name in ["ms.tex", "data.txt", "gen.py", "other.txt"]:
+        (tmp_path / name).write_text(name)
+    tree = {
+        "fig.pdf": ["data.txt", "gen.py"],
+        "ms.pdf": ["fig.pdf", "ms.tex"],
+    }
+    (tmp_path / ".showyourwork").mkdir()
+    with open(tmp_path / ".showyourwork" / "dependency_tree_simple.json", "w") as f:
+        json.dump(tree, f)
+    find_project_root.cache_clear()
+    with cwd(tmp_path):
+        yield tmp_path
+    find_project_root.cache_clear()
+
+
+def get_watcher(project: Path, builds: List[List[str]]) -> Watcher:
+    def build(targets: List[str]) -> int:
+        builds.append(targets)
+        return 0
+
+    return Watcher(project / "showyourwork.yml", project, build, 0.01, 0.2)
+
+
+TREE = ".showyourwork/dependency_tree_simple.json"
+
+
+def test_affected_targets(project: Path) -> None:
+    watcher = get_watcher(project, [])
+    # Since the synctex file isn't in the tree, it is always rebuilt
+    assert watcher.affected_targets({project / "gen.py"}) == [
+        "ms.pdf",
+        "ms.synctex.gz",
+        TREE,
+    ]
+    assert watcher.affected_targets({project / "ms.tex"}) == [
+        "ms.pdf",
+        "ms.synctex.gz",
+        TREE,
+    ]
+
+    watcher.tree["ms.synctex.gz"] = ["ms.tex"]
+    assert watcher.affected_targets({project / "data.txt"}) == ["ms.pdf", TREE]
+    assert watcher.affected_targets({project / "other.txt"}) == []
+    assert watcher.affected_targets({project / "showyourwork.yml"}) == [
+        "ms.pdf",
+        "ms.synctex.gz",
+        TREE,
+    ]
+
+
+def test_watched_files(project: Path) -> None:
+    watcher = get_watcher(project, [])
+    names = {str(f.relative_to(project)) for f in watcher.watched_files()}
+    assert names == {"showyourwork.yml", "ms.tex", "data.txt", "gen.py", "fig.pdf"}
+
+
+def test_debounce(project: Path) -> None:
+    watcher = get_watcher(project, [])
+    assert watcher.poll()
+    assert not watcher.poll()
+
+    def edit() -> None:
+        for name in ["ms.tex", "gen.py", "ms.tex"]:
+            time.sleep(0.02)
+            with open(project / name, "a") as f:
+                f.write("\n% edit")
+
+    thread = threading.Thread(target=edit)
+    thread.start()
+    changed = watcher.wait_for_changes()
+    thread.join()
+    assert changed == {project / "ms.tex", project / "gen.py"}
+
+
+def test_rebuild(project: Path) -> None:
+    builds: List[List[str]] = []
+    watcher = get_watcher(project, builds)
+    watcher.rebuild(watcher.all_targets())
+    assert builds == [["ms.pdf", "ms.synctex.gz", TREE]]
+    assert project / "ms.tex" in watcher.state
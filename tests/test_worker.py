@@ -0,0 +1,78 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+
+from showyourwork2.paths import package_data
+
+WORKER = package_data("showyourwork2", "worker.py")
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(os, "fork"), reason="worker servers require 'fork'"
+)
+
+
+def run(tmp_path: Path, script: str, *args: str) -> "subprocess.CompletedProcess[str]":
+    (tmp_path / "script.py").write_text(script)
+    env: Dict[str, str] = dict(os.environ, TMPDIR=str(tmp_path), EXTRA="value")
+    command: List[str] = [sys.executable, str(WORKER), "--preload", "decimal"]
+    command += ["--idle-timeout", "5", "script.py", *args]
+    return subprocess.run(
+        command, cwd=tmp_path, env=env, input="in", capture_output=True, text=True
+    )
+
+
+def test_worker(tmp_path: Path) -> None:
+    script = (
+        "import os, sys\n"
+        "print(sys.argv, 'decimal' in sys.modules, os.environ['EXTRA'])\n"
+        "print(sys.stdin.read(), file=sys.stderr)\n"
+        "open(sys.argv[1], 'w').write(__name__)\n"
+    )
+    for n in range(2):
+        result = run(tmp_path, script, f"output-{n}.txt")
+        assert result.returncode == 0
+        assert result.stdout == f"['script.py', 'output-{n}.txt'] True value\n"
+        assert result.stderr == "in\n"
+        assert (tmp_path / f"output-{n}.txt").read_text() == "__main__"
+
+
+def test_worker_exit_status(tmp_path: Path) -> None:
+    assert run(tmp_path, "import sys\nsys.exit(3)\n").returncode == 3  # noqa: PLR2004
+
+    result = run(tmp_path, "import sys\nsys.exit('failed')\n")
+    assert result.returncode == 1
+    assert result.stderr == "failed\n"
+
+    result = run(tmp_path, "def f():\n    raise ValueError('boom')\nf()\n")
+    assert result.returncode == 1
+    assert result.stderr.startswith("Traceback (most recent call last):\n")
+    assert "worker.py" not in result.stderr
+    assert result.stderr.endswith("ValueError: boom\n")
+
+    result = run(tmp_path, "import os, signal\nos.kill(os.getpid(), signal.SIGTERM)\n")
+    assert result.returncode == -15  # noqa: PLR2004
+
+
+def test_worker_import_environment(tmp_path: Path) -> None:
+    # Preloaded modules see the environment of the script that uses them
+    (tmp_path / "probe.py").write_text(
+        "import os\nTHREADS = os.environ.get('OMP_NUM_THREADS')\n"
+    )
+    (tmp_path / "script.py").write_text("import probe\nprint(probe.THREADS)\n")
+    command = [sys.executable, str(WORKER), "--preload", "probe"]
+    command += ["--idle-timeout", "5", "script.py"]
+    for threads in ["1", "2", "1"]:
+        env = dict(
+            os.environ,
+            TMPDIR=str(tmp_path),
+            PYTHONPATH=str(tmp_path),
+            OMP_NUM_THREADS=threads,
+        )
+        result = subprocess.run(
+            command, cwd=tmp_path, env=env, capture_output=True, text=True
+        )
+        assert result.stdout == f"{threads}\n"